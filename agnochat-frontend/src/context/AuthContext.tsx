@@ -71,29 +71,40 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
     initializeAuth();
   }, []);
 
+  const completeAuth = async (data: { access_token: string; user?: User }) => {
+    const { access_token } = data;
+    
+    // Set token first
+    setToken(access_token);
+    localStorage.setItem('token', access_token);
+    
+    // The backend returns the profile with the token; only older servers need /auth/me
+    if (data.user) {
+      setUser(data.user);
+      localStorage.setItem('user', JSON.stringify(data.user));
+      return;
+    }
+    
+    // Create a temporary axios instance with the token for immediate use
+    const tempApi = axios.create({
+      baseURL: process.env.REACT_APP_API_URL || 'http://localhost:8000/api',
+      headers: {
+        'Content-Type': 'application/json',
+        'Authorization': `Bearer ${access_token}`,
+      },
+    });
+    
+    // Get user info with the temporary instance
+    const userResponse = await tempApi.get('/auth/me');
+    
+    setUser(userResponse.data);
+    localStorage.setItem('user', JSON.stringify(userResponse.data));
+  };
+
   const login = async (email: string, password: string) => {
     try {
       const response = await authAPI.login({ email, password });
-      const { access_token } = response.data;
-      
-      // Set token first
-      setToken(access_token);
-      localStorage.setItem('token', access_token);
-      
-      // Create a temporary axios instance with the token for immediate use
-      const tempApi = axios.create({
-        baseURL: process.env.REACT_APP_API_URL || 'http://localhost:8000/api',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${access_token}`,
-        },
-      });
-      
-      // Get user info with the temporary instance
-      const userResponse = await tempApi.get('/auth/me');
-      
-      setUser(userResponse.data);
-      localStorage.setItem('user', JSON.stringify(userResponse.data));
+      await completeAuth(response.data);
     } catch (error) {
       throw error;
     }
@@ -107,26 +118,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
   }) => {
     try {
       const response = await authAPI.signup(userData);
-      const { access_token } = response.data;
-      
-      // Set token first
-      setToken(access_token);
-      localStorage.setItem('token', access_token);
-      
-      // Create a temporary axios instance with the token for immediate use
-      const tempApi = axios.create({
-        baseURL: process.env.REACT_APP_API_URL || 'http://localhost:8000/api',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${access_token}`,
-        },
-      });
-      
-      // Get user info with the temporary instance
-      const userResponse = await tempApi.get('/auth/me');
-      
-      setUser(userResponse.data);
-      localStorage.setItem('user', JSON.stringify(userResponse.data));
+      await completeAuth(response.data);
     } catch (error) {
       throw error;
     }
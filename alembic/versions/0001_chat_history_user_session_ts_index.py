@@ -0,0 +1,27 @@
+"""Add the (user_id, session_id, timestamp DESC) history index
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-15
+
+Databases created before the index was declared on ChatHistory don't have
+it; new databases get it from create_all, hence IF [NOT] EXISTS.
+"""
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Filter by user/session, newest first
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_chat_history_user_session_ts "
+        "ON chat_history (user_id, session_id, timestamp DESC)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_chat_history_user_session_ts")
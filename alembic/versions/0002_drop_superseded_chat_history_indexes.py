@@ -0,0 +1,30 @@
+"""Drop the session_id and timestamp indexes on chat_history
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-15
+
+ix_chat_history_user_session_ts (user_id, session_id, timestamp DESC) serves
+the history query, so the single-column indexes only add write amplification.
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+SUPERSEDED_INDEXES = (
+    ("ix_chat_history_session_id", "session_id"),
+    ("ix_chat_history_timestamp", "timestamp"),
+)
+
+
+def upgrade() -> None:
+    for index_name, _ in SUPERSEDED_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+
+def downgrade() -> None:
+    for index_name, column in SUPERSEDED_INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON chat_history ({column})")
@@ -0,0 +1,29 @@
+"""Add the (user_id, timestamp DESC) history index
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-15
+
+Serves history requests without a session_id filter, and makes the
+single-column user_id index redundant.
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Same shape as ix_chat_history_user_session_ts, for history requests without a session_id filter
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_chat_history_user_ts "
+        "ON chat_history (user_id, timestamp DESC)"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_chat_history_user_id")
+
+
+def downgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS ix_chat_history_user_id ON chat_history (user_id)")
+    op.execute("DROP INDEX IF EXISTS ix_chat_history_user_ts")
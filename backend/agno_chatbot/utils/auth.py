@@ -9,7 +9,7 @@ from typing import Optional
 from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from passlib.context import CryptContext
+import bcrypt
 from jose import JWTError, jwt
 from fastapi import HTTPException, status
 
@@ -51,9 +51,6 @@ class ChatHistory(Base):
 # Create tables
 Base.metadata.create_all(bind=engine)
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 def generate_user_id(email: str, first_name: Optional[str] = None) -> str:
     """Generate a unique user ID based on email and name."""
     # Extract username from email (part before @)
@@ -81,13 +78,14 @@ def generate_user_id(email: str, first_name: Optional[str] = None) -> str:
     
     return user_id
 
+# Password hashing
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
 
 def get_password_hash(password: str) -> str:
     """Generate password hash."""
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
 
 def create_access_token(data: dict) -> str:
     """Create JWT access token."""
@@ -4,21 +4,36 @@ Integrates Agno Framework, Zep Memory, Mem0 Memory, and PostgreSQL
 """
 
 import os
+import re
+import time
+import logging
+import textwrap
 import uuid
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from cachetools import TTLCache
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, Tuple
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 import httpx
-from fastapi import FastAPI, HTTPException, Depends, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import orjson
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response, BackgroundTasks, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, Field
-from sqlalchemy import create_engine, Column, String, DateTime, Text, Integer
+from sqlalchemy import create_engine, select, insert, func, text, or_, Column, String, DateTime, Text, Integer, Index
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from passlib.context import CryptContext
+import bcrypt
 import jwt
 from agno.agent import Agent
 from agno.models.google import Gemini
@@ -27,61 +42,90 @@ from agno.tools.mem0 import Mem0Tools
 from agno.storage.postgres import PostgresStorage
 from agno.memory.v2.db.postgres import PostgresMemoryDb
 from agno.memory.v2.memory import Memory
+from agno.tools.reasoning import ReasoningTools
 from mem0 import MemoryClient
 
-print("=" * 80)
-print("STARTING AGNOCHAT BOT BACKEND")
-print("=" * 80)
+# Debug output is off unless LOG_LEVEL=DEBUG, so per-request log calls cost a level check
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger("agnochat")
+
+logger.debug("STARTING AGNOCHAT BOT BACKEND")
 
 # Load environment variables from .env file
-print("STEP 1: Loading environment variables...")
+logger.debug("STEP 1: Loading environment variables...")
 load_dotenv()
-print("✓ Environment variables loaded")
+logger.debug("Environment variables loaded")
 
 # Environment Configuration
-print("STEP 2: Setting up environment configuration...")
-DATABASE_URL = os.getenv("DATABASE_URL")
-SECRET_KEY = os.getenv("SECRET_KEY")
+logger.debug("STEP 2: Setting up environment configuration...")
+
+def _require(name: str) -> str:
+    """Read a required environment variable, failing at startup if it is unset."""
+    value = os.getenv(name)
+    if not value:
+        raise RuntimeError(f"missing env var {name}")
+    return value
+
+DATABASE_URL = _require("DATABASE_URL")
+SECRET_KEY = _require("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-ZEP_API_KEY = os.getenv("ZEP_API_KEY")
-ZEP_BASE_URL = os.getenv("ZEP_BASE_URL")
-MEM0_API_KEY = os.getenv("MEM0_API_KEY")
+GEMINI_API_KEY = _require("GEMINI_API_KEY")
+ZEP_API_KEY = _require("ZEP_API_KEY")
+ZEP_BASE_URL = os.getenv("ZEP_BASE_URL", "https://api.getzep.com")
+MEM0_API_KEY = _require("MEM0_API_KEY")
 MEM0_API_URL = os.getenv("MEM0_API_URL")
 
-print(f"✓ Database URL: {'Configured' if DATABASE_URL else 'NOT CONFIGURED'}")
-print(f"✓ Secret Key: {'Configured' if SECRET_KEY else 'NOT CONFIGURED'}")
-print(f"✓ Gemini API Key: {'Configured' if GEMINI_API_KEY else 'NOT CONFIGURED'}")
-print(f"✓ Zep API Key: {'Configured' if ZEP_API_KEY else 'NOT CONFIGURED'}")
-print(f"✓ Mem0 API Key: {'Configured' if MEM0_API_KEY else 'NOT CONFIGURED'}")
+# Auth headers for direct REST calls, built once
+ZEP_HEADERS = {"Authorization": f"Api-Key {ZEP_API_KEY}"}
+MEM0_HEADERS = {"Authorization": f"Bearer {MEM0_API_KEY}"}
+
+logger.debug("Database URL: %s", 'Configured' if DATABASE_URL else 'NOT CONFIGURED')
+logger.debug("Secret Key: %s", 'Configured' if SECRET_KEY else 'NOT CONFIGURED')
+logger.debug("Gemini API Key: %s", 'Configured' if GEMINI_API_KEY else 'NOT CONFIGURED')
+logger.debug("Zep API Key: %s", 'Configured' if ZEP_API_KEY else 'NOT CONFIGURED')
+logger.debug("Mem0 API Key: %s", 'Configured' if MEM0_API_KEY else 'NOT CONFIGURED')
 
 # Set API keys as environment variables (required by SDKs)
-print("STEP 3: Setting API keys as environment variables...")
+logger.debug("STEP 3: Setting API keys as environment variables...")
 os.environ["MEM0_API_KEY"] = MEM0_API_KEY
 os.environ["GOOGLE_API_KEY"] = GEMINI_API_KEY
-print("✓ API keys set as environment variables")
+logger.debug("API keys set as environment variables")
 
 # Database Setup
-print("STEP 4: Setting up database connection...")
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+logger.debug("STEP 4: Setting up database connection...")
+# Pooled connections, validated on checkout and recycled before server-side idle timeouts.
+# Pools are per worker process: keep WORKERS * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+# below the server's max_connections (100 on a default Postgres).
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_OPTIONS = dict(pool_timeout=30, pool_pre_ping=True, pool_recycle=1800)
+# The sync engine only runs startup DDL, so it gets a minimal pool
+engine = create_engine(DATABASE_URL, pool_size=1, max_overflow=1, **DB_POOL_OPTIONS)
 Base = declarative_base()
-print("✓ Database engine and session created")
+logger.debug("Database engine created")
 
-# Password hashing
-print("STEP 5: Setting up password hashing...")
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-print("✓ Password hashing configured")
+# Async engine for request handlers so DB round-trips yield to the event loop
+logger.debug("STEP 4b: Setting up async database connection...")
+ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, **DB_POOL_OPTIONS
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+logger.debug("Async database engine and session created")
 
-# JWT Security
-print("STEP 6: Setting up JWT security...")
-security = HTTPBearer()
-print("✓ JWT security configured")
+# Password hashing
+logger.debug("STEP 5: Setting up password hashing...")
+# bcrypt cost factor; lower it (e.g. BCRYPT_ROUNDS=10) in development for faster logins
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+logger.debug("Password hashing configured")
 
 # Mem0 Client Setup
-print("STEP 7: Initializing Mem0 client...")
+logger.debug("STEP 7: Initializing Mem0 client...")
 mem0_client = MemoryClient()
-print("✓ Mem0 client initialized")
+logger.debug("Mem0 client initialized")
 
 # Pydantic Models
 class UserCreate(BaseModel):
@@ -98,6 +142,9 @@ class UserLogin(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    # Returned by signup/login so clients don't need a follow-up /api/auth/me
+    user_id: Optional[str] = None
+    user: Optional[Dict[str, Any]] = None
 
 class ChatMessage(BaseModel):
     user_id: str
@@ -162,69 +209,106 @@ class ChatHistory(Base):
     __tablename__ = "chat_history"
     
     id = Column(String, primary_key=True, index=True)
-    user_id = Column(String, nullable=False, index=True)
-    session_id = Column(String, nullable=False, index=True)
+    user_id = Column(String, nullable=False)
+    session_id = Column(String, nullable=False)
     message = Column(Text, nullable=True)  # User message
     response = Column(Text, nullable=True)  # Assistant response
     message_type = Column(String, nullable=False, default="user")  # "user" or "assistant"
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    timestamp = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # Matches the history query shape: filter by user/session, newest first
+        Index("ix_chat_history_user_session_ts", "user_id", "session_id", timestamp.desc()),
+        # Same for history requests without a session_id filter
+        Index("ix_chat_history_user_ts", "user_id", timestamp.desc()),
+    )
 
 # Create tables
-print("STEP 8: Creating database tables...")
+logger.debug("STEP 8: Creating database tables...")
+# Index changes on existing tables are Alembic revisions (alembic upgrade head)
 Base.metadata.create_all(bind=engine)
-print("✓ Database tables created")
+logger.debug("Database tables created")
 
 # Agno Agent Setup
-def create_user_agent(user_id: str, session_id: str):
-    """Create a new agent instance for a specific user and session."""
-    print(f"STEP: Creating Agno agent for user {user_id}, session {session_id}")
-    
-    # Initialize Agno memory with PostgreSQL for this user
-    print(f"  - Initializing PostgreSQL memory for user {user_id}")
-    memory = Memory(
-        db=PostgresMemoryDb(
-            table_name="agno_memories",
-            db_url=DATABASE_URL
-        )
-    )
-    print(f"  ✓ PostgreSQL memory initialized")
-    
-    # Initialize Zep tools with user-specific parameters
-    print(f"  - Initializing Zep tools for user {user_id}")
-    zep_tools = ZepTools(
+# The model, the memory database and the session storage hold connections/clients
+# but no per-user state, so every agent shares one instance of each instead of
+# reconnecting per user. Memory objects are not shared: they keep per-session
+# runs and the loaded user memories in process, so each agent builds its own.
+logger.debug("Initializing shared Agno model, memory database and storage...")
+shared_model = Gemini(api_key=GEMINI_API_KEY)
+shared_memory_db = PostgresMemoryDb(
+    table_name="agno_memories",
+    db_url=DATABASE_URL
+)
+shared_storage = PostgresStorage(
+    table_name="agno_sessions",
+    db_url=DATABASE_URL
+)
+# Reasoning tools keep no per-user state either
+shared_reasoning_tools = ReasoningTools(add_instructions=True)
+logger.debug("Shared Agno model, memory database and storage initialized")
+
+# Agent instructions are identical for every user; build them once
+AGENT_INSTRUCTIONS: Tuple[str, ...] = (
+    "You are an intelligent AI assistant with memory capabilities.",
+    "Use Zep tools to store and retrieve temporal memory and chat history.",
+    "Use Mem0 tools to store and retrieve fact-based memory.",
+    "Use reasoning tools to think through complex problems step by step.",
+    "Always provide helpful, context-aware responses.",
+    "Remember user preferences and past conversations.",
+    "When users share information about themselves, store it in memory.",
+    "Use memory to provide personalized responses.",
+    "CRITICAL MEMORY ISOLATION RULES:",
+    "1. ALWAYS use the user_id parameter when calling memory tools",
+    "2. NEVER share or access memories from different users",
+    "3. Each user must have completely separate memory spaces",
+    "4. When storing information, ensure it's stored only for the current user",
+    "5. When searching memory, only search within the current user's memory space",
+    "6. If no user_id is provided, do not access any memories",
+    "7. Verify user isolation before storing or retrieving any information",
+    "8. If asked to search for information, thoroughly search both Zep and Mem0 memories for the current user only",
+    "9. Provide detailed search results when information is found in memory",
+    "10. If no information is found, clearly state that no relevant information was found for this user",
+    "11. IMPORTANT: Always include the user_id in your tool calls to ensure proper isolation",
+    "12. NEVER reference or access data from other users' memory spaces",
+)
+
+def create_zep_tools(user_id: str, session_id: str) -> ZepTools:
+    """Create Zep tools bound to a user's session (no network I/O until first use)."""
+    return ZepTools(
         api_key=ZEP_API_KEY,
         user_id=user_id,
         session_id=session_id,
         add_instructions=True
     )
-    print(f"  ✓ Zep tools initialized")
+
+def create_user_agent(user_id: str, session_id: str):
+    """Create a new agent instance for a specific user and session."""
+    logger.debug("Creating Agno agent for user %s, session %s", user_id, session_id)
+    
+    # Initialize Zep tools with user-specific parameters
+    logger.debug("Initializing Zep tools for user %s", user_id)
+    zep_tools = create_zep_tools(user_id, session_id)
+    logger.debug("Zep tools initialized")
     
     # Initialize Mem0 tools with user-specific parameters
-    print(f"  - Initializing Mem0 tools for user {user_id}")
+    logger.debug("Initializing Mem0 tools for user %s", user_id)
     mem0_tools = Mem0Tools(
         api_key=MEM0_API_KEY,
         user_id=user_id,
         add_instructions=True
     )
-    print(f"  ✓ Mem0 tools initialized")
-    
-    # Add reasoning tools for better decision making
-    print(f"  - Initializing reasoning tools")
-    from agno.tools.reasoning import ReasoningTools
-    reasoning_tools = ReasoningTools(add_instructions=True)
-    print(f"  ✓ Reasoning tools initialized")
+    logger.debug("Mem0 tools initialized")
     
     # Create the user-specific Agno agent
-    print(f"  - Creating Agno agent instance")
+    logger.debug("Creating Agno agent instance")
     agent = Agent(
         name=f"AgnoChatBot-{user_id}",
-        model=Gemini(api_key=GEMINI_API_KEY),
-        tools=[reasoning_tools, zep_tools, mem0_tools],
-        memory=memory,
-        storage=PostgresStorage(
-            table_name="agno_sessions",
-            db_url=DATABASE_URL
-        ),
+        model=shared_model,
+        session_id=session_id,
+        tools=[shared_reasoning_tools, zep_tools, mem0_tools],
+        memory=Memory(db=shared_memory_db),
+        storage=shared_storage,
         enable_user_memories=True,
         enable_session_summaries=True,
         add_datetime_to_instructions=True,
@@ -232,164 +316,351 @@ def create_user_agent(user_id: str, session_id: str):
         num_history_responses=5,
         markdown=True,
         show_tool_calls=True,
-        instructions=[
-            "You are an intelligent AI assistant with memory capabilities.",
-            "Use Zep tools to store and retrieve temporal memory and chat history.",
-            "Use Mem0 tools to store and retrieve fact-based memory.",
-            "Use reasoning tools to think through complex problems step by step.",
-            "Always provide helpful, context-aware responses.",
-            "Remember user preferences and past conversations.",
-            "When users share information about themselves, store it in memory.",
-            "Use memory to provide personalized responses.",
-            "CRITICAL MEMORY ISOLATION RULES:",
-            "1. ALWAYS use the user_id parameter when calling memory tools",
-            "2. NEVER share or access memories from different users",
-            "3. Each user must have completely separate memory spaces",
-            "4. When storing information, ensure it's stored only for the current user",
-            "5. When searching memory, only search within the current user's memory space",
-            "6. If no user_id is provided, do not access any memories",
-            "7. Verify user isolation before storing or retrieving any information",
-            "8. If asked to search for information, thoroughly search both Zep and Mem0 memories for the current user only",
-            "9. Provide detailed search results when information is found in memory",
-            "10. If no information is found, clearly state that no relevant information was found for this user",
-            "11. IMPORTANT: Always include the user_id in your tool calls to ensure proper isolation",
-            "12. NEVER reference or access data from other users' memory spaces"
-        ]
+        instructions=list(AGENT_INSTRUCTIONS)
     )
-    print(f"  ✓ Agno agent created successfully")
+    logger.debug("Agno agent created successfully")
     
     return agent
 
-# Agent cache for performance (optional)
-print("STEP 9: Initializing agent cache...")
-_agent_cache = {}
-print("✓ Agent cache initialized")
+# Agent cache: one agent per (user, session). Agents are never re-pointed at
+# another session, so a run in one session can't be switched mid-flight by a
+# request for another. Bounded, and entries expire so agents (and their tool
+# clients) of idle sessions are dropped.
+logger.debug("STEP 9: Initializing agent cache...")
+AGENT_CACHE_MAXSIZE = int(os.getenv("AGENT_CACHE_MAXSIZE", "512"))
+AGENT_CACHE_TTL = int(os.getenv("AGENT_CACHE_TTL", "3600"))
+_agent_cache = TTLCache(maxsize=AGENT_CACHE_MAXSIZE, ttl=AGENT_CACHE_TTL)
+_agent_cache_lock = threading.Lock()
+logger.debug("Agent cache initialized")
 
 def get_user_agent(user_id: str, session_id: str):
-    """Get or create an agent for a specific user and session."""
-    print(f"STEP: Getting user agent for user {user_id}, session {session_id}")
-    cache_key = f"{user_id}:{session_id}"
-    
-    if cache_key not in _agent_cache:
-        print(f"  - Agent not in cache, creating new agent")
-        _agent_cache[cache_key] = create_user_agent(user_id, session_id)
-        print(f"  ✓ New agent created and cached")
-    else:
-        print(f"  ✓ Agent found in cache")
+    """Get or create the agent for a user's session."""
+    logger.debug("Getting user agent for user %s, session %s", user_id, session_id)
+    
+    cache_key = (user_id, session_id)
+    with _agent_cache_lock:
+        agent = _agent_cache.get(cache_key)
+        if agent is None:
+            logger.debug("Agent not in cache, creating new agent")
+            agent = create_user_agent(user_id, session_id)
+            _agent_cache[cache_key] = agent
+        else:
+            logger.debug("Agent found in cache")
     
-    return _agent_cache[cache_key]
+    return agent
+
+# Agent runs are synchronous LLM calls; run them on a bounded pool so they
+# never block the event loop (and cap concurrency against upstream rate limits)
+AGENT_MAX_WORKERS = int(os.getenv("AGENT_MAX_WORKERS", "16"))
+_agent_executor = ThreadPoolExecutor(max_workers=AGENT_MAX_WORKERS, thread_name_prefix="agno-agent")
+
+async def run_agent(agent, prompt: str, user_id: str, session_id: str):
+    """Run a synchronous Agno agent call in the agent thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _agent_executor,
+        partial(agent.run, prompt, user_id=user_id, session_id=session_id, stream=False)
+    )
+
+# Agent result cache: identical searches/syncs within the TTL reuse the last answer
+AGENT_RESULT_TTL = 30.0
+AGENT_RESULT_MAXSIZE = 1024
+_agent_result_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_agent_run_locks: Dict[tuple, asyncio.Lock] = {}
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query for use in cache keys."""
+    return query.strip().casefold()
+
+def invalidate_agent_search_results(user_id: str):
+    """Forget cached agent search answers for a user; called when their memories change."""
+    for key in [key for key in list(_agent_result_cache) if key[:2] == (user_id, "search")]:
+        _agent_result_cache.pop(key, None)
+
+def _get_cached_agent_result(cache_key: tuple):
+    entry = _agent_result_cache.get(cache_key)
+    if entry is None:
+        return None
+    expires_at, response = entry
+    if expires_at < time.monotonic():
+        _agent_result_cache.pop(cache_key, None)
+        return None
+    _agent_result_cache.move_to_end(cache_key)
+    return response
+
+async def cached_agent_run(agent, cache_key: tuple, prompt: str, user_id: str, session_id: str):
+    """
+    Run the agent, reusing a recent result for the same cache key.
+    
+    Concurrent calls with the same key are coalesced so only one of them
+    reaches the LLM; the others wait for and share its result.
+    """
+    response = _get_cached_agent_result(cache_key)
+    if response is not None:
+        logger.debug("Agent result served from cache")
+        return response
+    
+    lock = _agent_run_locks.setdefault(cache_key, asyncio.Lock())
+    try:
+        async with lock:
+            response = _get_cached_agent_result(cache_key)
+            if response is not None:
+                logger.debug("Agent result served from cache")
+                return response
+            
+            response = await run_agent(agent, prompt, user_id=user_id, session_id=session_id)
+            _agent_result_cache[cache_key] = (time.monotonic() + AGENT_RESULT_TTL, response)
+            _agent_result_cache.move_to_end(cache_key)
+            while len(_agent_result_cache) > AGENT_RESULT_MAXSIZE:
+                _agent_result_cache.popitem(last=False)
+            return response
+    finally:
+        if not lock.locked():
+            _agent_run_locks.pop(cache_key, None)
 
 # Utility Functions
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    print(f"STEP: Verifying password")
-    result = pwd_context.verify(plain_password, hashed_password)
-    print(f"✓ Password verification result: {result}")
+def uuid7() -> uuid.UUID:
+    """Generate a time-ordered UUIDv7 (48-bit ms timestamp + 74 random bits).
+    
+    Time-ordered ids keep inserts at the right edge of B-tree indexes.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (timestamp_ms & 0xFFFFFFFFFFFF) << 80
+    value |= 0x7 << 76                        # version
+    value |= ((rand >> 62) & 0xFFF) << 64     # rand_a
+    value |= 0b10 << 62                       # RFC 4122 variant
+    value |= rand & 0x3FFFFFFFFFFFFFFF        # rand_b
+    return uuid.UUID(int=value)
+
+UTC = timezone.utc
+_last_iso_timestamp = [0, ""]
+
+def iso_now() -> str:
+    """Current UTC time as ISO-8601, formatted at most once per second."""
+    now = int(time.time())
+    if now != _last_iso_timestamp[0]:
+        _last_iso_timestamp[0] = now
+        _last_iso_timestamp[1] = datetime.fromtimestamp(now, UTC).isoformat()
+    return _last_iso_timestamp[1]
+
+def content_to_text(response) -> str:
+    """Extract the text of an agent response, whatever shape its content has."""
+    content = getattr(response, "content", None)
+    if content is None:
+        return ""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, (bytes, bytearray)):
+        return content.decode("utf-8", "replace")
+    if isinstance(content, list):
+        return "".join(getattr(part, "text", None) or str(part) for part in content)
+    return str(content)
+
+# bcrypt is deliberately slow CPU work, so both helpers run it in a worker
+# thread to keep the event loop serving other requests
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    logger.debug("Verifying password")
+    result = await asyncio.to_thread(bcrypt.checkpw, plain_password.encode(), hashed_password.encode())
+    logger.debug("Password verification result: %s", result)
     return result
 
-def get_password_hash(password: str) -> str:
-    print(f"STEP: Hashing password")
-    hashed = pwd_context.hash(password)
-    print(f"✓ Password hashed successfully")
-    return hashed
+async def get_password_hash(password: str) -> str:
+    logger.debug("Hashing password")
+    hashed = await asyncio.to_thread(bcrypt.hashpw, password.encode(), bcrypt.gensalt(BCRYPT_ROUNDS))
+    logger.debug("Password hashed successfully")
+    return hashed.decode()
+
+# JWT signing parameters resolved once at import
+ACCESS_TOKEN_EXPIRE = timedelta(days=7)
+JWT_KEY = SECRET_KEY.encode()
+JWT_ALGORITHMS = [ALGORITHM]
 
 def create_access_token(data: dict) -> str:
-    print(f"STEP: Creating access token")
-    to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(days=7)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    print(f"✓ Access token created successfully")
+    logger.debug("Creating access token")
+    to_encode = {**data, "exp": datetime.now(UTC) + ACCESS_TOKEN_EXPIRE}
+    encoded_jwt = jwt.encode(to_encode, JWT_KEY, algorithm=ALGORITHM)
+    logger.debug("Access token created successfully")
     return encoded_jwt
 
+# Short-lived caches for the auth path. Only successful lookups are cached;
+# the lock keeps them safe for callers running in FastAPI's threadpool.
+TOKEN_CACHE_TTL = 10
+USER_CACHE_TTL = 5
+_token_cache = TTLCache(maxsize=10_000, ttl=TOKEN_CACHE_TTL)
+_user_cache = TTLCache(maxsize=10_000, ttl=USER_CACHE_TTL)
+_auth_cache_lock = threading.RLock()
+
 def verify_token(token: str) -> Optional[str]:
-    print(f"STEP: Verifying token")
+    logger.debug("Verifying token")
+    cache_key = hashlib.sha256(token.encode()).digest()
+    with _auth_cache_lock:
+        cached = _token_cache.get(cache_key)
+    if cached is not None:
+        email, expires_at = cached
+        if expires_at is None or expires_at > time.time():
+            logger.debug("Token verified from cache for email: %s", email)
+            return email
+        with _auth_cache_lock:
+            _token_cache.pop(cache_key, None)
+    
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, JWT_KEY, algorithms=JWT_ALGORITHMS)
         email: str = payload.get("sub")
-        print(f"✓ Token verified successfully for email: {email}")
+        logger.debug("Token verified successfully for email: %s", email)
+        if email is not None:
+            with _auth_cache_lock:
+                _token_cache[cache_key] = (email, payload.get("exp"))
         return email
     except jwt.PyJWTError as e:
-        print(f"✗ Token verification failed: {e}")
+        logger.warning("Token verification failed: %s", e)
         return None
 
-def get_db():
-    print(f"STEP: Getting database session")
-    db = SessionLocal()
-    print(f"✓ Database session created")
-    try:
+async def get_db():
+    """Yield an AsyncSession that is closed when the request finishes."""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
-        print(f"✓ Database session closed")
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)) -> User:
-    print(f"STEP: Getting current user from token")
-    token = credentials.credentials
-    print(f"  - Token received: {token[:20]}...")
-    
+async def resolve_user(token: str):
+    """Resolve a bearer token to (user, None), or (None, error detail) if it is not valid."""
     email = verify_token(token)
     if email is None:
-        print(f"✗ Token validation failed")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        logger.warning("Token validation failed")
+        return None, "Could not validate credentials"
     
-    print(f"  - Looking up user with email: {email}")
-    user = db.query(User).filter(User.email == email).first()
+    with _auth_cache_lock:
+        user = _user_cache.get(email)
+    if user is not None:
+        logger.debug("Current user authenticated from cache: %s", user.email)
+        return user, None
+    
+    logger.debug("Looking up user with email: %s", email)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(User).where(User.email == email))
+        user = result.scalars().first()
+    if user is None:
+        logger.warning("User not found in database")
+        return None, "User not found"
+    
+    with _auth_cache_lock:
+        _user_cache[email] = user
+    logger.debug("Current user authenticated: %s", user.email)
+    return user, None
+
+# Paths that never need the caller's identity
+PUBLIC_PATHS = frozenset({"/health", "/docs", "/redoc", "/openapi.json", "/api/auth/signup", "/api/auth/login"})
+
+class AuthMiddleware:
+    """Authenticate the bearer token once per request and store the result on request.state."""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] not in PUBLIC_PATHS:
+            state = scope.setdefault("state", {})
+            state["user"], state["auth_error"] = None, "Not authenticated"
+            for name, value in scope["headers"]:
+                if name == b"authorization":
+                    scheme, _, token = value.decode("latin-1").partition(" ")
+                    if scheme.lower() == "bearer" and token:
+                        state["user"], state["auth_error"] = await resolve_user(token)
+                    break
+        await self.app(scope, receive, send)
+
+# Declared only so OpenAPI advertises the bearer scheme (the /docs "Authorize"
+# button); the token itself is resolved once by AuthMiddleware
+security = HTTPBearer(auto_error=False)
+
+async def get_current_user(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+) -> User:
+    """Return the user AuthMiddleware resolved for this request, or reject with 401."""
+    user = getattr(request.state, "user", None)
     if user is None:
-        print(f"✗ User not found in database")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
+            detail=getattr(request.state, "auth_error", "Not authenticated"),
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    print(f"✓ Current user authenticated: {user.email}")
     return user
 
+async def require_matching_user(user_id: str, current_user: User = Depends(get_current_user)) -> User:
+    """Reject requests whose user_id query parameter is not the authenticated user.
+    
+    Runs as a dependency so a mismatch is answered with 403 before the
+    handler builds prompts or touches the database.
+    """
+    if user_id != current_user.id:
+        logger.warning("User ID mismatch: %s != %s", user_id, current_user.id)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User ID mismatch"
+        )
+    return current_user
+
 # Zep Client Functions
 from zep_cloud.client import Zep
 
 # Initialize Zep client
 zep_client = Zep(api_key=ZEP_API_KEY)
 
+# Shared HTTP clients for direct Zep/Mem0 REST calls. One pooled client per
+# upstream keeps connections alive and bakes in the base URL and auth header;
+# HTTP/2 lets concurrent fan-out calls share a single connection.
+HTTP_TIMEOUT = httpx.Timeout(10.0)
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=32)
+# Upper bound for a single awaited Zep/Mem0 call on the request path; a stalled
+# upstream degrades to a "timeout" result instead of holding the request open
+MEMORY_CALL_TIMEOUT = float(os.getenv("MEMORY_CALL_TIMEOUT", "3.0"))
+zep_http = httpx.AsyncClient(base_url=ZEP_BASE_URL, headers=ZEP_HEADERS, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS, http2=True)
+mem0_http = httpx.AsyncClient(base_url=MEM0_API_URL or "", headers=MEM0_HEADERS, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS, http2=True)
+
 async def zep_add_memory(session_id: str, messages: List[Dict[str, Any]]):
     """Add messages to Zep memory."""
-    print(f"STEP: Adding memory to Zep for session {session_id}")
-    print(f"  - Messages to add: {len(messages)}")
+    logger.debug("Adding memory to Zep for session %s", session_id)
+    logger.debug("Messages to add: %s", len(messages))
     
     try:
         # Use Zep client to add memory
-        result = zep_client.memory.add(session_id=session_id, messages=messages)
-        print(f"  - Response: {result}")
-        print(f"✓ Zep memory added successfully")
+        result = await asyncio.to_thread(zep_client.memory.add, session_id=session_id, messages=messages)
+        logger.debug("Response: %s", result)
+        logger.debug("Zep memory added successfully")
         return result
     except Exception as e:
-        print(f"✗ Error adding memory to Zep: {e}")
+        logger.warning("Error adding memory to Zep: %s", e)
         return {"error": str(e)}
 
+def _zep_message_to_dict(msg) -> Dict[str, Any]:
+    return {
+        "role": getattr(msg, 'role', 'unknown'),
+        "content": getattr(msg, 'content', ''),
+        "timestamp": getattr(msg, 'timestamp', '')
+    }
+
+def serialize_zep_messages(messages: list) -> List[Dict[str, Any]]:
+    """Convert Zep SDK messages to dicts, picking the serializer once per batch."""
+    if not messages:
+        return []
+    # Messages in one response share a class, so inspect the first one only
+    first = messages[0]
+    if hasattr(first, 'model_dump'):
+        return [msg.model_dump(mode="json") for msg in messages]
+    if hasattr(first, 'to_dict'):
+        return [msg.to_dict() for msg in messages]
+    return [_zep_message_to_dict(msg) for msg in messages]
+
 async def zep_get_memory(session_id: str):
     """Get memory from Zep."""
-    print(f"STEP: Getting memory from Zep for session {session_id}")
+    logger.debug("Getting memory from Zep for session %s", session_id)
     
     try:
         # Use Zep client to get memory
-        memory = zep_client.memory.get(session_id=session_id)
+        memory = await asyncio.to_thread(zep_client.memory.get, session_id=session_id)
         
         # Convert messages to serializable format
-        messages = []
-        if hasattr(memory, 'messages') and memory.messages:
-            for msg in memory.messages:
-                if hasattr(msg, 'to_dict'):
-                    messages.append(msg.to_dict())
-                else:
-                    messages.append({
-                        "role": getattr(msg, 'role', 'unknown'),
-                        "content": getattr(msg, 'content', ''),
-                        "timestamp": getattr(msg, 'timestamp', '')
-                    })
+        messages = serialize_zep_messages(getattr(memory, 'messages', None) or [])
         
         result = {
             "context": memory.context if hasattr(memory, 'context') else "",
@@ -397,29 +668,69 @@ async def zep_get_memory(session_id: str):
             "facts": memory.facts if hasattr(memory, 'facts') else [],
             "session_id": session_id
         }
-        print(f"  - Response: {result}")
-        print(f"✓ Zep memory retrieved successfully")
+        logger.debug("Response: %s", result)
+        logger.debug("Zep memory retrieved successfully")
         return result
     except Exception as e:
-        print(f"✗ Error getting memory from Zep: {e}")
+        logger.warning("Error getting memory from Zep: %s", e)
         return {"error": str(e), "session_id": session_id}
 
+# Direct search results, keyed by (system, user_id, normalized query). Entries
+# for a user are dropped whenever new memories are written for them.
+SEARCH_CACHE_TTL = 60
+_search_cache = TTLCache(maxsize=4096, ttl=SEARCH_CACHE_TTL)
+_search_locks: Dict[tuple, asyncio.Lock] = {}
+
+def invalidate_search_cache(user_id: str):
+    """Forget cached search results for a user."""
+    for key in [key for key in list(_search_cache.keys()) if key[1] == user_id]:
+        _search_cache.pop(key, None)
+
+@asynccontextmanager
+async def search_flight(cache_key: tuple):
+    """
+    Serialize concurrent searches for the same key, so only the first reaches
+    the upstream and the rest find its result in _search_cache.
+    """
+    lock = _search_locks.setdefault(cache_key, asyncio.Lock())
+    try:
+        async with lock:
+            yield
+    finally:
+        if not lock.locked():
+            _search_locks.pop(cache_key, None)
+
 async def zep_search_memory(user_id: str, query: str):
     """Search memory in Zep."""
-    print(f"STEP: Searching Zep memory for user {user_id}")
-    print(f"  - Search query: {query}")
+    logger.debug("Searching Zep memory for user %s", user_id)
+    logger.debug("Search query: %s", query)
+    cache_key = ("zep", user_id, normalize_query(query))
+    if cache_key in _search_cache:
+        logger.debug("Zep search served from cache")
+        return _search_cache[cache_key]
     
-    try:
-        # Use Zep client to search memory
-        results = zep_client.memory.search(query=query, user_id=user_id)
-        print(f"  - Search results: {results}")
-        print(f"✓ Zep memory search completed")
-        return results
-    except Exception as e:
-        print(f"✗ Error searching Zep memory: {e}")
-        return {"error": str(e), "user_id": user_id}
+    async with search_flight(cache_key):
+        if cache_key in _search_cache:
+            logger.debug("Zep search served from cache")
+            return _search_cache[cache_key]
+        
+        try:
+            # Use Zep client to search memory
+            results = await asyncio.to_thread(zep_client.memory.search, query=query, user_id=user_id)
+            _search_cache[cache_key] = results
+            logger.debug("Search results: %s", results)
+            logger.debug("Zep memory search completed")
+            return results
+        except Exception as e:
+            logger.warning("Error searching Zep memory: %s", e)
+            return {"error": str(e), "user_id": user_id}
 
 # Mem0 Client Functions
+@lru_cache(maxsize=4096)
+def mem0_user_filters(user_id: str) -> Dict[str, Any]:
+    """Filters restricting a Mem0 query to one user's memories (shared; do not mutate)."""
+    return {"AND": [{"user_id": user_id}]}
+
 async def mem0_add_memory(user_id: str, messages: List[Dict[str, Any]]):
     """
     Add messages to Mem0 memory.
@@ -433,19 +744,19 @@ async def mem0_add_memory(user_id: str, messages: List[Dict[str, Any]]):
     Returns:
         dict: Response from Mem0 API
     """
-    print(f"STEP: Adding memory to Mem0 for user {user_id}")
-    print(f"  - Messages to add: {len(messages)}")
-    print(f"  - Message content: {messages}")
+    logger.debug("Adding memory to Mem0 for user %s", user_id)
+    logger.debug("Messages to add: %s", len(messages))
+    logger.debug("Message content: %s", messages)
     
     try:
         # Use mem0_client.add() internally with v2 version
-        print(f"  - Calling mem0_client.add() with v2 version")
-        result = mem0_client.add(messages, user_id=user_id, version="v2")
-        print(f"  - Mem0 API response: {result}")
-        print(f"✓ Successfully added {len(messages)} messages to Mem0 for user {user_id}")
+        logger.debug("Calling mem0_client.add() with v2 version")
+        result = await asyncio.to_thread(mem0_client.add, messages, user_id=user_id, version="v2")
+        logger.debug("Mem0 API response: %s", result)
+        logger.debug("Successfully added %s messages to Mem0 for user %s", len(messages), user_id)
         return result
     except Exception as e:
-        print(f"✗ Error adding memory to Mem0 for user {user_id}: {e}")
+        logger.warning("Error adding memory to Mem0 for user %s: %s", user_id, e)
         return None
 
 async def mem0_search_memory(user_id: str, query: str):
@@ -461,29 +772,33 @@ async def mem0_search_memory(user_id: str, query: str):
     Returns:
         list: Search results from Mem0
     """
-    print(f"STEP: Searching Mem0 memory for user {user_id}")
-    print(f"  - Search query: {query}")
+    logger.debug("Searching Mem0 memory for user %s", user_id)
+    logger.debug("Search query: %s", query)
+    cache_key = ("mem0", user_id, normalize_query(query))
+    if cache_key in _search_cache:
+        logger.debug("Mem0 search served from cache")
+        return _search_cache[cache_key]
     
-    try:
-        # Create filters to search only within this user's memories
-        filters = {
-            "AND": [
-                {
-                    "user_id": user_id
-                }
-            ]
-        }
-        print(f"  - Search filters: {filters}")
-        
-        # Use mem0_client.search() internally with v2 version
-        print(f"  - Calling mem0_client.search() with v2 version")
-        results = mem0_client.search(query, version="v2", filters=filters)
-        print(f"  - Search results: {results}")
-        print(f"✓ Successfully searched Mem0 for user {user_id} with query: {query}")
-        return results
-    except Exception as e:
-        print(f"✗ Error searching Mem0 for user {user_id}: {e}")
-        return []
+    async with search_flight(cache_key):
+        if cache_key in _search_cache:
+            logger.debug("Mem0 search served from cache")
+            return _search_cache[cache_key]
+        
+        try:
+            # Create filters to search only within this user's memories
+            filters = mem0_user_filters(user_id)
+            logger.debug("Search filters: %s", filters)
+            
+            # Use mem0_client.search() internally with v2 version
+            logger.debug("Calling mem0_client.search() with v2 version")
+            results = await asyncio.to_thread(mem0_client.search, query, version="v2", filters=filters)
+            _search_cache[cache_key] = results
+            logger.debug("Search results: %s", results)
+            logger.debug("Successfully searched Mem0 for user %s with query: %s", user_id, query)
+            return results
+        except Exception as e:
+            logger.warning("Error searching Mem0 for user %s: %s", user_id, e)
+            return []
 
 async def mem0_get_all_memories(user_id: str):
     """
@@ -495,181 +810,309 @@ async def mem0_get_all_memories(user_id: str):
         user_id (str): The user ID to get memories for
         
     Returns:
-        list: All memories for the user
+        list: All memories for the user, or None if Mem0 could not be read
     """
-    print(f"STEP: Getting all memories from Mem0 for user {user_id}")
+    logger.debug("Getting all memories from Mem0 for user %s", user_id)
     
     try:
         # Create filters to get only memories for this user
-        filters = {
-            "AND": [
-                {
-                    "user_id": user_id
-                }
-            ]
-        }
-        print(f"  - Memory filters: {filters}")
+        filters = mem0_user_filters(user_id)
+        logger.debug("Memory filters: %s", filters)
         
         # Use mem0_client.get_all() internally with v2 version
-        print(f"  - Calling mem0_client.get_all() with v2 version")
-        memories = mem0_client.get_all(version="v2", filters=filters, page=1, page_size=50)
-        print(f"  - Retrieved memories: {memories}")
-        print(f"✓ Successfully retrieved {len(memories) if memories else 0} memories from Mem0 for user {user_id}")
+        logger.debug("Calling mem0_client.get_all() with v2 version")
+        memories = await asyncio.to_thread(mem0_client.get_all, version="v2", filters=filters, page=1, page_size=50)
+        logger.debug("Retrieved memories: %s", memories)
+        logger.debug("Successfully retrieved %s memories from Mem0 for user %s", len(memories) if memories else 0, user_id)
         return memories
     except Exception as e:
-        print(f"✗ Error getting memories from Mem0 for user {user_id}: {e}")
-        return []
+        logger.warning("Error getting memories from Mem0 for user %s: %s", user_id, e)
+        return None
+
+# Per-user Mem0 memory context for the chat prompt, formatted once and capped
+# to bound prompt size; dropped after each memory write
+MEM0_MEMORIES_CACHE_TTL = 30
+MEM0_CONTEXT_MAX_MEMORIES = 20
+_mem0_memories_cache = TTLCache(maxsize=4096, ttl=MEM0_MEMORIES_CACHE_TTL)
+
+async def mem0_get_memory_context(user_id: str) -> str:
+    """Return the user's Mem0 memories as a "- memory" bullet list for the chat prompt."""
+    memory_context = _mem0_memories_cache.get(user_id)
+    if memory_context is not None:
+        logger.debug("Mem0 memory context served from cache")
+        return memory_context
+    
+    user_memories = await mem0_get_all_memories(user_id)
+    if user_memories is None:
+        # Not cached: a Mem0 error must not read as "no memories" for the TTL
+        raise RuntimeError("Mem0 memories could not be retrieved")
+    logger.debug("Retrieved %s memories from Mem0", len(user_memories))
+    if user_memories:
+        memory_context = "\n".join(f"- {memory['memory']}" for memory in user_memories[:MEM0_CONTEXT_MAX_MEMORIES])
+    else:
+        memory_context = "No previous memories found."
+    _mem0_memories_cache[user_id] = memory_context
+    return memory_context
+
+# Memory write batching: writes for the same Zep session / Mem0 user that land
+# within a short window are sent as one add call
+MEMORY_BATCH_MAX_MESSAGES = 32
+MEMORY_BATCH_MAX_WAIT = 0.05
+
+class MemoryWriteBatcher:
+    """Coalesce memory writes per key and flush them with a single call."""
+    
+    def __init__(self, flush, max_messages: int = MEMORY_BATCH_MAX_MESSAGES, max_wait: float = MEMORY_BATCH_MAX_WAIT):
+        self._flush = flush
+        self.max_messages = max_messages
+        self.max_wait = max_wait
+        self._pending: Dict[str, tuple] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: set = set()
+    
+    async def add(self, key: str, messages: List[Dict[str, Any]]):
+        """Queue messages for key; resolves with the result of the flush that sent them."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch_messages, waiters = self._pending.setdefault(key, ([], []))
+        batch_messages.extend(messages)
+        waiters.append(future)
+        if len(batch_messages) >= self.max_messages:
+            self._dispatch(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.max_wait, self._dispatch, key)
+        return await future
+    
+    def _dispatch(self, key: str):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        task = asyncio.get_running_loop().create_task(self._run(key, *batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _run(self, key: str, messages: List[Dict[str, Any]], waiters: list):
+        logger.debug("Flushing %s batched memory messages for %s", len(messages), key)
+        try:
+            result = await self._flush(key, messages)
+        except Exception as e:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+        else:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(result)
+
+zep_write_batcher = MemoryWriteBatcher(zep_add_memory)
+mem0_write_batcher = MemoryWriteBatcher(mem0_add_memory)
+
+def invalidate_user_memory_caches(user_id: str):
+    """Drop everything cached from a user's memories; call once a memory write has landed."""
+    invalidate_search_cache(user_id)
+    invalidate_agent_search_results(user_id)
+    _mem0_memories_cache.pop(user_id, None)
+
+# Memory fan-out: Zep and Mem0 are independent, so hit both at once
+async def fanout_memory_write(user_id: str, session_id: str, messages: List[Dict[str, Any]]):
+    """Store a conversation turn in Zep and Mem0 concurrently."""
+    timestamp = iso_now()
+    zep_messages = [
+        {**message, "metadata": {"user_id": user_id, "timestamp": timestamp}}
+        for message in messages
+    ]
+    zep_result, mem0_result = await asyncio.gather(
+        zep_write_batcher.add(session_id, zep_messages),
+        mem0_write_batcher.add(user_id, messages),
+        return_exceptions=True
+    )
+    # Only after the writes land: a search in the meantime would re-cache pre-write results
+    invalidate_user_memory_caches(user_id)
+    return {"zep": zep_result, "mem0": mem0_result}
+
+async def fanout_memory_search(user_id: str, query: str):
+    """Search Zep and Mem0 concurrently; returns (zep_results, mem0_results)."""
+    return await asyncio.gather(
+        zep_search_memory(user_id, query),
+        mem0_search_memory(user_id, query),
+        return_exceptions=True
+    )
+
+# Users confirmed to exist upstream, keyed by (system, user_id). Only positive
+# answers are cached so a user that was just created is re-checked.
+USER_EXISTS_CACHE_TTL = 3600
+_user_exists_cache = TTLCache(maxsize=10_000, ttl=USER_EXISTS_CACHE_TTL)
 
 # Enhanced Zep User Management Functions
 async def zep_check_user_exists(user_id: str) -> bool:
     """Check if a user exists in Zep."""
-    print(f"STEP: Checking if Zep user {user_id} exists")
+    logger.debug("Checking if Zep user %s exists", user_id)
+    if ("zep", user_id) in _user_exists_cache:
+        logger.debug("Zep user existence served from cache")
+        return True
     
     try:
-        async with httpx.AsyncClient() as client:
-            url = f"{ZEP_BASE_URL}/v2/users/{user_id}"
-            headers = {"Authorization": f"Api-Key {ZEP_API_KEY}"}
-            
-            print(f"  - Making GET request to: {url}")
-            response = await client.get(url, headers=headers)
-            exists = response.status_code == 200
-            print(f"  - Response status: {response.status_code}")
-            print(f"  - User exists: {exists}")
-            print(f"✓ Zep user existence check completed")
-            return exists
+        url = f"/v2/users/{user_id}"
+        
+        logger.debug("Making GET request to: %s", url)
+        response = await zep_http.get(url)
+        exists = response.status_code == 200
+        if exists:
+            _user_exists_cache[("zep", user_id)] = True
+        logger.debug("Response status: %s", response.status_code)
+        logger.debug("User exists: %s", exists)
+        logger.debug("Zep user existence check completed")
+        return exists
     except Exception as e:
-        print(f"✗ Error checking Zep user existence: {e}")
+        logger.warning("Error checking Zep user existence: %s", e)
         return False
 
 async def zep_create_user(user_id: str, user_data: dict):
     """Create a new user in Zep."""
-    print(f"STEP: Creating Zep user {user_id}")
-    print(f"  - User data: {user_data}")
+    logger.debug("Creating Zep user %s", user_id)
+    logger.debug("User data: %s", user_data)
     
     try:
-        async with httpx.AsyncClient() as client:
-            url = f"{ZEP_BASE_URL}/v2/users"
-            headers = {"Authorization": f"Api-Key {ZEP_API_KEY}"}
-            
-            # Build payload with only provided fields
-            payload = {"user_id": user_id}
-            
-            # Add optional fields only if they exist
-            if user_data.get("email"):
-                payload["email"] = user_data["email"]
-            if user_data.get("first_name"):
-                payload["first_name"] = user_data["first_name"]
-            if user_data.get("last_name"):
-                payload["last_name"] = user_data["last_name"]
-            
-            # Add metadata
-            payload["metadata"] = {
-                "username": user_data.get("username"),
-                "created_at": datetime.utcnow().isoformat(),
-                "source": "agnochat_bot"
-            }
-            
-            print(f"  - Making POST request to: {url}")
-            print(f"  - Payload: {payload}")
-            response = await client.post(url, json=payload, headers=headers)
-            
-            print(f"  - Response status: {response.status_code}")
-            if response.status_code == 201:
-                result = response.json()
-                print(f"  - Response: {result}")
-                print(f"✓ Zep user created successfully")
-                return result
-            else:
-                print(f"  - Response: {response.text}")
-                print(f"✗ Failed to create Zep user. Status: {response.status_code}")
-                return None
+        url = "/v2/users"
+        
+        # Build payload with only provided fields
+        payload = {"user_id": user_id}
+        
+        # Add optional fields only if they exist
+        if user_data.get("email"):
+            payload["email"] = user_data["email"]
+        if user_data.get("first_name"):
+            payload["first_name"] = user_data["first_name"]
+        if user_data.get("last_name"):
+            payload["last_name"] = user_data["last_name"]
+        
+        # Add metadata
+        payload["metadata"] = {
+            "username": user_data.get("username"),
+            "created_at": iso_now(),
+            "source": "agnochat_bot"
+        }
+        
+        logger.debug("Making POST request to: %s", url)
+        logger.debug("Payload: %s", payload)
+        response = await zep_http.post(url, json=payload)
+        
+        logger.debug("Response status: %s", response.status_code)
+        if response.status_code == 201:
+            result = response.json()
+            logger.debug("Response: %s", result)
+            logger.debug("Zep user created successfully")
+            return result
+        else:
+            logger.debug("Response: %s", response.text)
+            logger.warning("Failed to create Zep user. Status: %s", response.status_code)
+            return None
     except Exception as e:
-        print(f"✗ Error creating Zep user: {e}")
+        logger.warning("Error creating Zep user: %s", e)
         return None
 
 async def zep_get_or_create_user(user_id: str, user_data: dict):
     """Get existing user or create new user in Zep."""
-    print(f"STEP: Getting or creating Zep user {user_id}")
+    logger.debug("Getting or creating Zep user %s", user_id)
     
     # Check if user exists
     user_exists = await zep_check_user_exists(user_id)
     
     if user_exists:
-        print(f"✓ Zep user {user_id} already exists")
+        logger.debug("Zep user %s already exists", user_id)
         return {"status": "exists", "user_id": user_id}
     else:
-        print(f"  - Creating new Zep user {user_id}")
+        logger.debug("Creating new Zep user %s", user_id)
         result = await zep_create_user(user_id, user_data)
         if result:
-            print(f"✓ Zep user created successfully")
+            logger.debug("Zep user created successfully")
             return {"status": "created", "user_id": user_id, "data": result}
         else:
-            print(f"✗ Failed to create Zep user")
+            logger.warning("Failed to create Zep user")
             return {"status": "failed", "user_id": user_id}
 
 async def zep_update_user(user_id: str, user_data: dict):
     """Update an existing user in Zep."""
-    print(f"STEP: Updating Zep user {user_id}")
-    print(f"  - Update data: {user_data}")
+    logger.debug("Updating Zep user %s", user_id)
+    logger.debug("Update data: %s", user_data)
     
     try:
-        async with httpx.AsyncClient() as client:
-            url = f"{ZEP_BASE_URL}/v2/users/{user_id}"
-            headers = {"Authorization": f"Api-Key {ZEP_API_KEY}"}
-            
-            # Build update payload
-            payload = {}
-            
-            if user_data.get("email"):
-                payload["email"] = user_data["email"]
-            if user_data.get("first_name"):
-                payload["first_name"] = user_data["first_name"]
-            if user_data.get("last_name"):
-                payload["last_name"] = user_data["last_name"]
-            
-            # Add metadata
-            payload["metadata"] = {
-                "username": user_data.get("username"),
-                "updated_at": datetime.utcnow().isoformat(),
-                "source": "agnochat_bot"
-            }
-            
-            print(f"  - Making PATCH request to: {url}")
-            print(f"  - Update payload: {payload}")
-            response = await client.patch(url, json=payload, headers=headers)
-            
-            print(f"  - Response status: {response.status_code}")
-            if response.status_code == 200:
-                result = response.json()
-                print(f"  - Response: {result}")
-                print(f"✓ Zep user updated successfully")
-                return result
-            else:
-                print(f"  - Response: {response.text}")
-                print(f"✗ Failed to update Zep user. Status: {response.status_code}")
-                return None
+        url = f"/v2/users/{user_id}"
+        
+        # Build update payload
+        payload = {}
+        
+        if user_data.get("email"):
+            payload["email"] = user_data["email"]
+        if user_data.get("first_name"):
+            payload["first_name"] = user_data["first_name"]
+        if user_data.get("last_name"):
+            payload["last_name"] = user_data["last_name"]
+        
+        # Add metadata
+        payload["metadata"] = {
+            "username": user_data.get("username"),
+            "updated_at": iso_now(),
+            "source": "agnochat_bot"
+        }
+        
+        logger.debug("Making PATCH request to: %s", url)
+        logger.debug("Update payload: %s", payload)
+        response = await zep_http.patch(url, json=payload)
+        
+        logger.debug("Response status: %s", response.status_code)
+        if response.status_code == 200:
+            result = response.json()
+            logger.debug("Response: %s", result)
+            logger.debug("Zep user updated successfully")
+            return result
+        else:
+            logger.debug("Response: %s", response.text)
+            logger.warning("Failed to update Zep user. Status: %s", response.status_code)
+            return None
     except Exception as e:
-        print(f"✗ Error updating Zep user: {e}")
+        logger.warning("Error updating Zep user: %s", e)
         return None
 
 async def zep_get_user_sessions(user_id: str):
     """Get all sessions for a user in Zep."""
-    print(f"STEP: Getting Zep sessions for user {user_id}")
+    logger.debug("Getting Zep sessions for user %s", user_id)
     
     try:
-        async with httpx.AsyncClient() as client:
-            url = f"{ZEP_BASE_URL}/v2/users/{user_id}/sessions"
-            headers = {"Authorization": f"Api-Key {ZEP_API_KEY}"}
-            
-            print(f"  - Making GET request to: {url}")
-            response = await client.get(url, headers=headers)
-            result = response.json() if response.status_code == 200 else None
-            print(f"  - Response status: {response.status_code}")
-            print(f"  - Response: {result}")
-            print(f"✓ Zep user sessions retrieved successfully")
-            return result
+        url = f"/v2/users/{user_id}/sessions"
+        
+        logger.debug("Making GET request to: %s", url)
+        response = await zep_http.get(url)
+        result = response.json() if response.status_code == 200 else None
+        logger.debug("Response status: %s", response.status_code)
+        logger.debug("Response: %s", result)
+        logger.debug("Zep user sessions retrieved successfully")
+        return result
+    except Exception as e:
+        logger.warning("Error getting Zep user sessions: %s", e)
+        return None
+
+async def zep_get_user_facts(user_id: str) -> Optional[List[Dict[str, Any]]]:
+    """Get the facts Zep has extracted for a user; None if Zep could not be read."""
+    logger.debug("Getting Zep facts for user %s", user_id)
+    
+    try:
+        url = f"/v2/users/{user_id}/facts"
+        
+        logger.debug("Making GET request to: %s", url)
+        response = await zep_http.get(url)
+        logger.debug("Response status: %s", response.status_code)
+        if response.status_code != 200:
+            logger.warning("Zep user facts request failed with status %s", response.status_code)
+            return None
+        facts = response.json().get("facts") or []
+        logger.debug("Retrieved %s Zep facts", len(facts))
+        return facts
     except Exception as e:
-        print(f"✗ Error getting Zep user sessions: {e}")
+        logger.warning("Error getting Zep user facts: %s", e)
         return None
 
 # Enhanced Mem0 User Management Functions
@@ -687,29 +1130,32 @@ async def mem0_check_user_exists(user_id: str) -> bool:
     Returns:
         bool: True if user exists, False otherwise
     """
-    print(f"STEP: Checking if Mem0 user {user_id} exists")
+    logger.debug("Checking if Mem0 user %s exists", user_id)
+    if ("mem0", user_id) in _user_exists_cache:
+        logger.debug("Mem0 user existence served from cache")
+        return True
     
     try:
-        async with httpx.AsyncClient() as client:
-            # Construct the URL to get memories for this specific user
-            url = f"{MEM0_API_URL}/v1/memories"
-            headers = {"Authorization": f"Bearer {MEM0_API_KEY}"}
-            
-            # Set parameters to get just 1 memory for this user (efficient check)
-            params = {"user_id": user_id, "page": 1, "page_size": 1}
-            print(f"  - Making GET request to: {url}")
-            print(f"  - Parameters: {params}")
-            response = await client.get(url, headers=headers, params=params)
-            
-            # If we get a successful response (200), user exists (even if no memories)
-            # If we get an error (404, 500, etc.), user doesn't exist
-            exists = response.status_code == 200
-            print(f"  - Response status: {response.status_code}")
-            print(f"  - User exists: {exists}")
-            print(f"✓ Mem0 user existence check completed")
-            return exists
+        # Construct the URL to get memories for this specific user
+        url = "/v1/memories"
+        
+        # Set parameters to get just 1 memory for this user (efficient check)
+        params = {"user_id": user_id, "page": 1, "page_size": 1}
+        logger.debug("Making GET request to: %s", url)
+        logger.debug("Parameters: %s", params)
+        response = await mem0_http.get(url, params=params)
+        
+        # If we get a successful response (200), user exists (even if no memories)
+        # If we get an error (404, 500, etc.), user doesn't exist
+        exists = response.status_code == 200
+        if exists:
+            _user_exists_cache[("mem0", user_id)] = True
+        logger.debug("Response status: %s", response.status_code)
+        logger.debug("User exists: %s", exists)
+        logger.debug("Mem0 user existence check completed")
+        return exists
     except Exception as e:
-        print(f"✗ Error checking Mem0 user existence: {e}")
+        logger.warning("Error checking Mem0 user existence: %s", e)
         return False
 
 async def mem0_create_user(user_id: str, user_data: dict):
@@ -727,47 +1173,48 @@ async def mem0_create_user(user_id: str, user_data: dict):
     Returns:
         dict: The response from Mem0 API if successful, None if failed
     """
-    print(f"STEP: Creating Mem0 user {user_id}")
-    print(f"  - User data: {user_data}")
+    logger.debug("Creating Mem0 user %s", user_id)
+    logger.debug("User data: %s", user_data)
     
     try:
-        async with httpx.AsyncClient() as client:
-            # Construct the URL to add a new memory
-            url = f"{MEM0_API_URL}/v1/memories"
-            headers = {"Authorization": f"Bearer {MEM0_API_KEY}"}
-            
-            # Create the initial memory for the user
-            # This memory serves as a "user profile" and account creation record
-            initial_memory = {
-                "user_id": user_id,  # Link this memory to the specific user
-                "memory": f"User {user_data.get('first_name', '')} {user_data.get('last_name', '')} created account with email {user_data.get('email', '')}",
-                "metadata": {
-                    "type": "user_creation",  # Mark this as a user creation memory
-                    "username": user_data.get("username"),  # Store username for reference
-                    "created_at": datetime.utcnow().isoformat()  # Timestamp when user was created
-                }
+        # Construct the URL to add a new memory
+        url = "/v1/memories"
+        
+        # Create the initial memory for the user
+        # This memory serves as a "user profile" and account creation record
+        first_name = user_data.get("first_name") or ""
+        last_name = user_data.get("last_name") or ""
+        email = user_data.get("email") or ""
+        initial_memory = {
+            "user_id": user_id,  # Link this memory to the specific user
+            "memory": f"User {first_name} {last_name} created account with email {email}",
+            "metadata": {
+                "type": "user_creation",  # Mark this as a user creation memory
+                "username": user_data.get("username"),  # Store username for reference
+                "created_at": iso_now()  # Timestamp when user was created
             }
-            
-            print(f"  - Making POST request to: {url}")
-            print(f"  - Initial memory: {initial_memory}")
-            
-            # Send POST request to Mem0 API to create the memory
-            response = await client.post(url, json=initial_memory, headers=headers)
-            
-            print(f"  - Response status: {response.status_code}")
-            # Return the response data if successful (201 = Created)
-            # Return None if failed (any other status code)
-            if response.status_code == 201:
-                result = response.json()
-                print(f"  - Response: {result}")
-                print(f"✓ Mem0 user created successfully")
-                return result
-            else:
-                print(f"  - Response: {response.text}")
-                print(f"✗ Failed to create Mem0 user. Status: {response.status_code}")
-                return None
+        }
+        
+        logger.debug("Making POST request to: %s", url)
+        logger.debug("Initial memory: %s", initial_memory)
+        
+        # Send POST request to Mem0 API to create the memory
+        response = await mem0_http.post(url, json=initial_memory)
+        
+        logger.debug("Response status: %s", response.status_code)
+        # Return the response data if successful (201 = Created)
+        # Return None if failed (any other status code)
+        if response.status_code == 201:
+            result = response.json()
+            logger.debug("Response: %s", result)
+            logger.debug("Mem0 user created successfully")
+            return result
+        else:
+            logger.debug("Response: %s", response.text)
+            logger.warning("Failed to create Mem0 user. Status: %s", response.status_code)
+            return None
     except Exception as e:
-        print(f"✗ Error creating Mem0 user: {e}")
+        logger.warning("Error creating Mem0 user: %s", e)
         return None
 
 async def mem0_get_or_create_user(user_id: str, user_data: dict):
@@ -787,34 +1234,47 @@ async def mem0_get_or_create_user(user_id: str, user_data: dict):
     Returns:
         dict: Status information about the operation
     """
-    print(f"STEP: Getting or creating Mem0 user {user_id}")
+    logger.debug("Getting or creating Mem0 user %s", user_id)
     
     # Step 1: Check if user already exists in Mem0
     user_exists = await mem0_check_user_exists(user_id)
     
     if user_exists:
         # User already exists - no need to create anything
-        print(f"✓ Mem0 user {user_id} already exists")
+        logger.debug("Mem0 user %s already exists", user_id)
         return {"status": "exists", "user_id": user_id}
     else:
         # User doesn't exist - create new user with initial memory
-        print(f"  - Creating new Mem0 user {user_id}")
+        logger.debug("Creating new Mem0 user %s", user_id)
         result = await mem0_create_user(user_id, user_data)
         
         if result:
             # User creation successful
-            print(f"✓ Mem0 user created successfully")
+            logger.debug("Mem0 user created successfully")
             return {"status": "created", "user_id": user_id, "data": result}
         else:
             # User creation failed
-            print(f"✗ Failed to create Mem0 user")
+            logger.warning("Failed to create Mem0 user")
             return {"status": "failed", "user_id": user_id}
 
+# Users fully provisioned in both memory systems; returning logins skip the
+# upstream get-or-create calls entirely
+PROVISIONED_USERS_TTL = 86400
+_provisioned_users = TTLCache(maxsize=100_000, ttl=PROVISIONED_USERS_TTL)
+
 # Unified User Management Function
 async def ensure_user_exists_in_memory_systems(user_id: str, user_data: dict):
     """Ensure user exists in both Zep and Mem0, create if not exists."""
-    print(f"STEP: Ensuring user {user_id} exists in memory systems")
-    print(f"  - User data: {user_data}")
+    logger.debug("Ensuring user %s exists in memory systems", user_id)
+    logger.debug("User data: %s", user_data)
+    
+    if user_id in _provisioned_users:
+        logger.debug("User %s already provisioned in memory systems", user_id)
+        return {
+            "zep": {"status": "exists", "user_id": user_id},
+            "mem0": {"status": "exists", "user_id": user_id},
+            "overall_status": "success"
+        }
     
     results = {
         "zep": None,
@@ -822,48 +1282,189 @@ async def ensure_user_exists_in_memory_systems(user_id: str, user_data: dict):
         "overall_status": "success"
     }
     
-    # Handle Zep user
-    print(f"  - Processing Zep user...")
-    try:
-        results["zep"] = await zep_get_or_create_user(user_id, user_data)
-        if results["zep"]["status"] == "failed":
-            results["overall_status"] = "partial_failure"
-            print(f"  ✗ Zep user processing failed")
-        else:
-            print(f"  ✓ Zep user processing completed: {results['zep']['status']}")
-    except Exception as e:
-        print(f"  ✗ Error managing Zep user: {e}")
-        results["zep"] = {"status": "error", "error": str(e)}
-        results["overall_status"] = "partial_failure"
+    # Provision Zep and Mem0 users concurrently; the two calls share no data
+    logger.debug("Processing Zep and Mem0 users...")
+    zep_result, mem0_result = await asyncio.gather(
+        asyncio.wait_for(zep_get_or_create_user(user_id, user_data), timeout=MEMORY_CALL_TIMEOUT),
+        asyncio.wait_for(mem0_get_or_create_user(user_id, user_data), timeout=MEMORY_CALL_TIMEOUT),
+        return_exceptions=True
+    )
     
-    # Handle Mem0 user
-    print(f"  - Processing Mem0 user...")
-    try:
-        results["mem0"] = await mem0_get_or_create_user(user_id, user_data)
-        if results["mem0"]["status"] == "failed":
+    for system, name, result in (("zep", "Zep", zep_result), ("mem0", "Mem0", mem0_result)):
+        if isinstance(result, asyncio.TimeoutError):
+            logger.warning("%s user processing timed out after %ss", name, MEMORY_CALL_TIMEOUT)
+            results[system] = {"status": "timeout", "user_id": user_id}
+            results["overall_status"] = "partial_failure"
+        elif isinstance(result, Exception):
+            logger.warning("Error managing %s user: %s", name, result)
+            results[system] = {"status": "error", "error": str(result)}
+            results["overall_status"] = "partial_failure"
+        elif result["status"] == "failed":
+            results[system] = result
             results["overall_status"] = "partial_failure"
-            print(f"  ✗ Mem0 user processing failed")
+            logger.warning("%s user processing failed", name)
         else:
-            print(f"  ✓ Mem0 user processing completed: {results['mem0']['status']}")
-    except Exception as e:
-        print(f"  ✗ Error managing Mem0 user: {e}")
-        results["mem0"] = {"status": "error", "error": str(e)}
-        results["overall_status"] = "partial_failure"
+            results[system] = result
+            logger.debug("%s user processing completed: %s", name, result['status'])
     
-    print(f"✓ Memory system user management completed")
-    print(f"  - Overall status: {results['overall_status']}")
-    print(f"  - Zep status: {results['zep']['status'] if results['zep'] else 'None'}")
-    print(f"  - Mem0 status: {results['mem0']['status'] if results['mem0'] else 'None'}")
+    logger.debug("Memory system user management completed")
+    logger.debug("Overall status: %s", results['overall_status'])
+    logger.debug("Zep status: %s", results['zep']['status'] if results['zep'] else 'None')
+    logger.debug("Mem0 status: %s", results['mem0']['status'] if results['mem0'] else 'None')
     
+    if results["overall_status"] == "success":
+        _provisioned_users[user_id] = True
     return results
 
+# Memory Consolidation Helpers
+def _normalize_fact(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+def diff_memory_facts(zep_facts: List[Dict[str, Any]], mem0_memories: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """
+    Compare Zep facts with Mem0 memories.
+    
+    Entries present in both stores (ignoring case and whitespace) already agree
+    and are dropped; only the facts held by a single store are returned.
+    
+    Matching is exact on the normalized text. Zep and Mem0 extract facts with
+    different LLM pipelines and rarely phrase the same fact identically, so most
+    real entries end up "only" in one store and go to the agent; an empty diff
+    mostly means both stores hold nothing (or the same verbatim entries).
+    """
+    zep_texts = {_normalize_fact(f["fact"]): f["fact"] for f in zep_facts if f.get("fact")}
+    mem0_texts = {_normalize_fact(m["memory"]): m["memory"] for m in mem0_memories if m.get("memory")}
+    return {
+        "zep_only": [text for key, text in zep_texts.items() if key not in mem0_texts],
+        "mem0_only": [text for key, text in mem0_texts.items() if key not in zep_texts],
+    }
+
+def _format_fact_list(facts: List[str]) -> str:
+    return "\n".join(f"- {fact}" for fact in facts) if facts else "- (none)"
+
+# Prompt Templates
+SEARCH_PROMPT_TEMPLATE = textwrap.dedent("""
+    Search all memory sources (Zep and Mem0) of user {user_id} for information related to: {query}
+
+    Mem0 search results:
+    {mem0_context}
+
+    Zep search results:
+    {zep_context}
+
+    Constraints:
+    - Only use this user's memories; never access or search other users' memory spaces, and pass user_id={user_id} in every tool call
+    - Use Zep for temporal/conversation memories and Mem0 for factual/personal information; consider exact, partial and related matches
+    - Summarize everything relevant you find, or clearly state that nothing relevant was found
+    """).strip()
+
+SYNC_PROMPT_TEMPLATE = textwrap.dedent("""
+    Perform a comprehensive memory synchronization for user {user_id}.
+
+    Facts stored only in Zep:
+    {zep_only}
+
+    Facts stored only in Mem0:
+    {mem0_only}
+
+    Tasks:
+    1. Review the facts above; everything else already matches across Zep and Mem0
+    2. Identify any conflicting information
+    3. Resolve conflicts by keeping the most recent/accurate data
+    4. Update both memory systems to be consistent
+    5. Provide a summary of what was synchronized
+
+    Focus on:
+    - Personal information (name, preferences, etc.)
+    - Recent conversation context
+    - Any contradictory data points
+
+    CRITICAL: Only work with memories for user {user_id}. Do NOT access memories from other users.
+    """).strip()
+
+MEMORY_UPDATE_PROMPT_TEMPLATE = textwrap.dedent("""
+    User message: {message}
+    User ID: {user_id}
+
+    Previous memories about this user:
+    {memory_context}
+
+    This appears to be a memory update request. Please:
+    1. Process the user's request to update their information for user ID: {user_id}
+    2. Store the updated information in BOTH Zep and Mem0 memory systems for user {user_id}
+    3. Ensure consistency across all memory sources for user {user_id}
+    4. Confirm the update was successful for user {user_id}
+    5. Provide a clear response about what was updated for user {user_id}
+
+    CRITICAL: Only update memories for user {user_id}. Do NOT modify memories for other users.
+    Important: Make sure the information is stored consistently in both memory systems for this specific user.
+
+    MEMORY STORAGE INSTRUCTIONS:
+    - Use Zep tools to store temporal/conversation memories for user {user_id}
+    - Use Mem0 tools to store factual/personal information for user {user_id}
+    - Make sure both systems are updated with the same information for user {user_id}
+    - Confirm storage in both systems before responding
+    """).strip()
+
+CHAT_PROMPT_TEMPLATE = textwrap.dedent("""
+    User message: {message}
+    User ID: {user_id}
+
+    Previous memories about this user:
+    {memory_context}
+
+    CRITICAL: Only access memories for user {user_id}. Do NOT access memories from other users.
+    If you don't have specific memories for user {user_id}, start fresh and don't reference other users' data.
+
+    Respond to the user's message based ONLY on their own memories and context.
+    Use the memory context above to provide personalized responses.
+    """).strip()
+
 # FastAPI App
-print("STEP 10: Initializing FastAPI application...")
-app = FastAPI(title="AgnoChat Bot API", version="1.0.0")
-print("✓ FastAPI app created")
+# Warm-up is best effort: an unreachable upstream must not hold startup for the full HTTP_TIMEOUT
+HTTP_WARMUP_TIMEOUT = httpx.Timeout(3.0)
+
+async def warm_up_http_clients():
+    """Open a pooled connection to each upstream so the first request skips the TLS handshake."""
+    warmups = [zep_http.get("/healthz", timeout=HTTP_WARMUP_TIMEOUT)]
+    if MEM0_API_URL:
+        warmups.append(mem0_http.get("/", timeout=HTTP_WARMUP_TIMEOUT))
+    for result in await asyncio.gather(*warmups, return_exceptions=True):
+        if isinstance(result, Exception):
+            logger.warning("HTTP client warm-up failed: %r", result)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up the shared clients, and close them and the DB pools on shutdown."""
+    await warm_up_http_clients()
+    
+    logger.info("=" * 80)
+    logger.info("AGNOCHAT BOT BACKEND STARTED")
+    logger.info("Database URL: %s", "Configured" if DATABASE_URL else "NOT CONFIGURED")
+    logger.info("Gemini API Key: %s", "Configured" if GEMINI_API_KEY else "NOT CONFIGURED")
+    logger.info("Zep API Key: %s", "Configured" if ZEP_API_KEY else "NOT CONFIGURED")
+    logger.info("Mem0 API Key: %s", "Configured" if MEM0_API_KEY else "NOT CONFIGURED")
+    logger.info("=" * 80)
+    yield
+    
+    logger.info("Shutting down: closing shared clients")
+    await zep_http.aclose()
+    await mem0_http.aclose()
+    await async_engine.dispose()
+    engine.dispose()
+    _agent_executor.shutdown(wait=False, cancel_futures=True)
+
+logger.debug("Initializing FastAPI application...")
+app = FastAPI(
+    title="AgnoChat Bot API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
+logger.debug("FastAPI app created")
 
 # CORS middleware
-print("STEP 11: Adding CORS middleware...")
+logger.debug("Adding CORS middleware...")
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -871,84 +1472,93 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-print("✓ CORS middleware added")
+logger.debug("CORS middleware added")
+app.add_middleware(AuthMiddleware)
+
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """Log unexpected errors once and return a generic 500 response."""
+    logger.exception("Unhandled error on %s %s", request.method, request.url.path)
+    return ORJSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={"detail": "Internal server error"}
+    )
 
 # Health Check
+# Load balancers probe every few seconds; the full check hits the LLM and DB
+HEALTH_CACHE_TTL = 15.0
+_health_cache: Dict[str, Any] = {"expires_at": 0.0, "response": None}
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Health check endpoint."""
-    print("=" * 80)
-    print("HEALTH CHECK REQUEST RECEIVED")
-    print("=" * 80)
+    """Health check endpoint; repeat probes within HEALTH_CACHE_TTL reuse the last result."""
+    logger.debug("HEALTH CHECK REQUEST RECEIVED")
+    if _health_cache["response"] is not None and time.monotonic() < _health_cache["expires_at"]:
+        logger.debug("Health check served from cache")
+        return _health_cache["response"]
     
     try:
         services = {}
         
-        # Check Agno agent creation (test with dummy user)
-        print("STEP: Testing Agno agent creation...")
+        # Check Agno agent creation (test with dummy user). Construct only:
+        # running it would spend a Gemini call on every probe.
+        logger.debug("Testing Agno agent creation...")
         try:
             test_agent = create_user_agent("health_check", "health_check")
-            test_response = test_agent.run(
-                "Health check",
-                user_id="health_check",
-                session_id="health_check",
-                stream=False
-            )
-            services["agno_agent"] = "active" if test_response else "error"
-            print(f"✓ Agno agent test completed: {services['agno_agent']}")
+            services["agno_agent"] = "active" if test_agent is not None else "error"
+            logger.debug("Agno agent test completed: %s", services['agno_agent'])
         except Exception as e:
             services["agno_agent"] = "error"
-            print(f"✗ Agno agent test failed: {e}")
+            logger.warning("Agno agent test failed: %s", e)
         
         # Check database connection
-        print("STEP: Testing database connection...")
+        logger.debug("Testing database connection...")
         try:
-            db = SessionLocal()
-            db.execute("SELECT 1")
-            db.close()
+            # Reuses a pooled connection (pre-pinged on checkout)
+            async with async_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
             services["postgresql"] = "connected"
-            print(f"✓ Database connection test completed: {services['postgresql']}")
+            logger.debug("Database connection test completed: %s", services['postgresql'])
         except Exception as e:
             services["postgresql"] = "disconnected"
-            print(f"✗ Database connection test failed: {e}")
+            logger.warning("Database connection test failed: %s", e)
         
         # Check external APIs
-        print("STEP: Checking external API configurations...")
+        logger.debug("Checking external API configurations...")
         services["gemini"] = "configured" if GEMINI_API_KEY else "not_configured"
         services["zep"] = "configured" if ZEP_API_KEY else "not_configured"
         services["mem0"] = "configured" if MEM0_API_KEY else "not_configured"
-        print(f"✓ External API check completed:")
-        print(f"  - Gemini: {services['gemini']}")
-        print(f"  - Zep: {services['zep']}")
-        print(f"  - Mem0: {services['mem0']}")
+        logger.debug("External API check completed:")
+        logger.debug("Gemini: %s", services['gemini'])
+        logger.debug("Zep: %s", services['zep'])
+        logger.debug("Mem0: %s", services['mem0'])
         
         # Determine overall status
         overall_status = "healthy"
         if any(status in ["error", "disconnected", "not_configured"] for status in services.values()):
             overall_status = "degraded"
         
-        print(f"✓ Overall health status: {overall_status}")
+        logger.debug("Overall health status: %s", overall_status)
         
         response = HealthResponse(
             status=overall_status,
-            timestamp=datetime.utcnow().isoformat(),
+            timestamp=iso_now(),
             services=services
         )
         
-        print("=" * 80)
-        print("HEALTH CHECK RESPONSE:")
-        print(f"Status: {response.status}")
-        print(f"Timestamp: {response.timestamp}")
-        print(f"Services: {response.services}")
-        print("=" * 80)
+        logger.debug("HEALTH CHECK RESPONSE:")
+        logger.debug("Status: %s", response.status)
+        logger.debug("Timestamp: %s", response.timestamp)
+        logger.debug("Services: %s", response.services)
         
+        _health_cache.update(response=response, expires_at=time.monotonic() + HEALTH_CACHE_TTL)
         return response
         
     except Exception as e:
-        print(f"✗ Health check failed with error: {e}")
+        logger.warning("Health check failed with error: %s", e)
         response = HealthResponse(
             status="error",
-            timestamp=datetime.utcnow().isoformat(),
+            timestamp=iso_now(),
             services={
                 "agno_agent": "unknown",
                 "gemini": "unknown",
@@ -958,129 +1568,154 @@ async def health_check():
             }
         )
         
-        print("=" * 80)
-        print("HEALTH CHECK ERROR RESPONSE:")
-        print(f"Status: {response.status}")
-        print(f"Timestamp: {response.timestamp}")
-        print(f"Services: {response.services}")
-        print("=" * 80)
+        logger.debug("HEALTH CHECK ERROR RESPONSE:")
+        logger.debug("Status: %s", response.status)
+        logger.debug("Timestamp: %s", response.timestamp)
+        logger.debug("Services: %s", response.services)
         
         return response
 
 # Authentication Endpoints
+def user_profile(user: User) -> Dict[str, Any]:
+    """Public profile fields returned by /api/auth/me and with signup/login tokens."""
+    return {
+        "user_id": user.id,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "username": user.username
+    }
+
 @app.post("/api/auth/signup", response_model=Token)
-async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
+async def signup(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """
     Create a new user account and return JWT token.
     
     This endpoint handles user registration with the following steps:
     1. Validate that the email is not already registered
-    2. Create user in PostgreSQL database
-    3. Create user in Mem0 memory system
-    4. Create user in Zep memory system
-    5. Generate and return JWT token
+    2. Create user in Mem0 and Zep memory systems, concurrently with step 3
+    3. Create user in PostgreSQL database
+    4. Generate and return JWT token
     
     Args:
         user_data (UserCreate): User registration data (email, password, first_name, last_name, username)
-        db (Session): Database session
+        db (AsyncSession): Database session
         
     Returns:
         Token: JWT token for authentication
     """
-    print("=" * 80)
-    print("SIGNUP REQUEST RECEIVED")
-    print("=" * 80)
-    print(f"User data: {user_data}")
+    logger.debug("SIGNUP REQUEST RECEIVED")
+    logger.debug("User data: %s", user_data)
     
     try:
-        # Step 1: Check if user already exists in PostgreSQL
-        print("STEP 1: Checking if user already exists in database...")
-        existing_user = db.query(User).filter(User.email == user_data.email).first()
-        if existing_user:
-            print(f"✗ User with email {user_data.email} already exists")
+        # Step 1: Check if user already exists in PostgreSQL. Both unique
+        # columns are checked here, before any memory-system user is created.
+        logger.debug("Checking if user already exists in database...")
+        username = user_data.username or user_data.email.split('@')[0]  # Use email prefix if no username
+        result = await db.execute(
+            select(User.email, User.username)
+            .where(or_(User.email == user_data.email, User.username == username))
+            .limit(2)
+        )
+        conflicts = result.all()
+        if any(row.email == user_data.email for row in conflicts):
+            logger.warning("User with email %s already exists", user_data.email)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
-        print(f"✓ Email {user_data.email} is available")
+        if conflicts:
+            logger.warning("Username %s already taken", username)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Username already taken"
+            )
+        logger.debug("Email %s is available", user_data.email)
         
-        # Step 2: Create user in PostgreSQL database
-        print("STEP 2: Creating user in PostgreSQL database...")
         user_id = str(uuid.uuid4())  # Generate unique user ID
-        hashed_password = get_password_hash(user_data.password)  # Hash the password
-        
-        # Create user record in PostgreSQL
-        db_user = User(
-            id=user_id,
-            email=user_data.email,
-            username=user_data.username or user_data.email.split('@')[0],  # Use email prefix if no username
-            first_name=user_data.first_name,
-            last_name=user_data.last_name,
-            hashed_password=hashed_password
-        )
-        
-        # Save user to database
-        db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
-        print(f"✓ User created in database with ID: {user_id}")
         
-        # Step 3: Prepare user data for memory systems
-        print("STEP 3: Preparing user data for memory systems...")
+        # Step 2: Prepare user data for memory systems
+        logger.debug("Preparing user data for memory systems...")
         # This data will be used to create user profiles in Mem0 and Zep
         memory_user_data = {
             "email": user_data.email,
             "first_name": user_data.first_name,
             "last_name": user_data.last_name,
-            "username": user_data.username or user_data.email.split('@')[0]
+            "username": username
         }
-        print(f"✓ Memory user data prepared: {memory_user_data}")
+        logger.debug("Memory user data prepared: %s", memory_user_data)
+        
+        # Step 3: Start creating the user in memory systems (Mem0 and Zep).
+        # Provisioning only needs user_id, so it runs while the password is
+        # hashed and the database row is written.
+        logger.debug("Creating user in memory systems...")
+        memory_task = asyncio.create_task(ensure_user_exists_in_memory_systems(user_id, memory_user_data))
         
-        # Step 4: Create user in memory systems (Mem0 and Zep)
-        print("STEP 4: Creating user in memory systems...")
-        # This ensures the user has memory profiles in both systems
-        memory_results = await ensure_user_exists_in_memory_systems(user_id, memory_user_data)
+        # Step 4: Create user in PostgreSQL database
+        logger.debug("Creating user in PostgreSQL database...")
+        try:
+            hashed_password = await get_password_hash(user_data.password)  # Hash the password
+            
+            # Create user record in PostgreSQL
+            db_user = User(
+                id=user_id,
+                email=user_data.email,
+                username=username,
+                first_name=user_data.first_name,
+                last_name=user_data.last_name,
+                hashed_password=hashed_password
+            )
+            
+            # Save user to database
+            db.add(db_user)
+            await db.commit()
+            await db.refresh(db_user)
+        except BaseException:
+            # Stop provisioning that hasn't been sent yet. Zep/Mem0 users already
+            # created can't be rolled back; the uniqueness checks above make this
+            # path rare (a concurrent signup racing for the same email/username).
+            memory_task.cancel()
+            raise
+        logger.debug("User created in database with ID: %s", user_id)
+        
+        memory_results = await memory_task
         
         # Step 5: Log the results of memory system creation
-        print("STEP 5: Logging memory system results...")
-        print(f"Memory system results for user {user_id}:")
-        print(f"  Zep: {memory_results['zep']['status']}")
-        print(f"  Mem0: {memory_results['mem0']['status']}")
-        print(f"  Overall: {memory_results['overall_status']}")
+        logger.debug("Logging memory system results...")
+        logger.debug("Memory system results for user %s:", user_id)
+        logger.debug("Zep: %s", memory_results['zep']['status'])
+        logger.debug("Mem0: %s", memory_results['mem0']['status'])
+        logger.debug("Overall: %s", memory_results['overall_status'])
         
         # Step 6: Generate JWT token for authentication
-        print("STEP 6: Generating JWT token...")
+        logger.debug("Generating JWT token...")
         access_token = create_access_token(data={"sub": db_user.email})
-        print(f"✓ JWT token generated successfully")
+        logger.debug("JWT token generated successfully")
         
         # Step 7: Return the authentication token
-        print("STEP 7: Returning authentication token...")
-        response = Token(access_token=access_token, token_type="bearer")
+        logger.debug("Returning authentication token...")
+        response = Token(
+            access_token=access_token, token_type="bearer", user_id=db_user.id, user=user_profile(db_user)
+        )
         
-        print("=" * 80)
-        print("SIGNUP RESPONSE:")
-        print(f"User ID: {user_id}")
-        print(f"Email: {user_data.email}")
-        print(f"Token type: {response.token_type}")
-        print(f"Token: {response.access_token[:50]}...")
-        print("=" * 80)
+        logger.debug("SIGNUP RESPONSE:")
+        logger.debug("User ID: %s", user_id)
+        logger.debug("Email: %s", user_data.email)
+        logger.debug("Token type: %s", response.token_type)
+        logger.debug("Token: %s...", response.access_token[:50])
         
         return response
         
-    except HTTPException:
-        # Re-raise HTTP exceptions (like "email already registered")
-        print("✗ Signup failed with HTTP exception")
-        raise
-    except Exception as e:
-        # Handle any other unexpected errors
-        print(f"✗ Signup failed with unexpected error: {e}")
+    except (httpx.HTTPError, SQLAlchemyError) as e:
+        # Upstream HTTP or database failure
+        logger.warning("Signup failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create user: {str(e)}"
         )
 
 @app.post("/api/auth/login", response_model=Token)
-async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     """
     Authenticate user and return JWT token.
     
@@ -1092,33 +1727,32 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     
     Args:
         user_credentials (UserLogin): User login credentials (email, password)
-        db (Session): Database session
+        db (AsyncSession): Database session
         
     Returns:
         Token: JWT token for authentication
     """
-    print("=" * 80)
-    print("LOGIN REQUEST RECEIVED")
-    print("=" * 80)
-    print(f"Login attempt for email: {user_credentials.email}")
+    logger.debug("LOGIN REQUEST RECEIVED")
+    logger.debug("Login attempt for email: %s", user_credentials.email)
     
     try:
         # Step 1: Find user in PostgreSQL database by email
-        print("STEP 1: Looking up user in database...")
-        user = db.query(User).filter(User.email == user_credentials.email).first()
+        logger.debug("Looking up user in database...")
+        result = await db.execute(select(User).where(User.email == user_credentials.email))
+        user = result.scalars().first()
         
         # Step 2: Verify password
-        print("STEP 2: Verifying password...")
-        if not user or not verify_password(user_credentials.password, user.hashed_password):
-            print(f"✗ Authentication failed for email: {user_credentials.email}")
+        logger.debug("Verifying password...")
+        if not user or not await verify_password(user_credentials.password, user.hashed_password):
+            logger.warning("Authentication failed for email: %s", user_credentials.email)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password"
             )
-        print(f"✓ Password verified successfully for user: {user.email}")
+        logger.debug("Password verified successfully for user: %s", user.email)
         
         # Step 3: Prepare user data for memory system check/update
-        print("STEP 3: Preparing user data for memory systems...")
+        logger.debug("Preparing user data for memory systems...")
         # This ensures the user has proper memory profiles in Mem0 and Zep
         user_data = {
             "email": user.email,
@@ -1126,48 +1760,44 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
             "last_name": user.last_name,
             "username": user.username
         }
-        print(f"✓ User data prepared: {user_data}")
+        logger.debug("User data prepared: %s", user_data)
         
         # Step 4: Check and update memory systems
-        print("STEP 4: Checking and updating memory systems...")
+        logger.debug("Checking and updating memory systems...")
         # This will:
         # - Create user in Mem0/Zep if they don't exist (new user)
         # - Update user in Mem0/Zep if they exist (returning user)
         memory_results = await ensure_user_exists_in_memory_systems(user.id, user_data)
         
         # Step 5: Log the results of memory system operations
-        print("STEP 5: Logging memory system results...")
-        print(f"Login - Memory system results for user {user.id}:")
-        print(f"  Zep: {memory_results['zep']['status']}")
-        print(f"  Mem0: {memory_results['mem0']['status']}")
-        print(f"  Overall: {memory_results['overall_status']}")
+        logger.debug("Logging memory system results...")
+        logger.debug("Login - Memory system results for user %s:", user.id)
+        logger.debug("Zep: %s", memory_results['zep']['status'])
+        logger.debug("Mem0: %s", memory_results['mem0']['status'])
+        logger.debug("Overall: %s", memory_results['overall_status'])
         
         # Step 6: Generate JWT token for authentication
-        print("STEP 6: Generating JWT token...")
+        logger.debug("Generating JWT token...")
         access_token = create_access_token(data={"sub": user.email})
-        print(f"✓ JWT token generated successfully")
+        logger.debug("JWT token generated successfully")
         
         # Step 7: Return the authentication token
-        print("STEP 7: Returning authentication token...")
-        response = Token(access_token=access_token, token_type="bearer")
+        logger.debug("Returning authentication token...")
+        response = Token(
+            access_token=access_token, token_type="bearer", user_id=user.id, user=user_profile(user)
+        )
         
-        print("=" * 80)
-        print("LOGIN RESPONSE:")
-        print(f"User ID: {user.id}")
-        print(f"Email: {user.email}")
-        print(f"Token type: {response.token_type}")
-        print(f"Token: {response.access_token[:50]}...")
-        print("=" * 80)
+        logger.debug("LOGIN RESPONSE:")
+        logger.debug("User ID: %s", user.id)
+        logger.debug("Email: %s", user.email)
+        logger.debug("Token type: %s", response.token_type)
+        logger.debug("Token: %s...", response.access_token[:50])
         
         return response
         
-    except HTTPException:
-        # Re-raise HTTP exceptions (like "incorrect password")
-        print("✗ Login failed with HTTP exception")
-        raise
-    except Exception as e:
-        # Handle any other unexpected errors
-        print(f"✗ Login failed with unexpected error: {e}")
+    except (httpx.HTTPError, SQLAlchemyError) as e:
+        # Upstream HTTP or database failure
+        logger.warning("Login failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Login failed: {str(e)}"
@@ -1176,235 +1806,360 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
 @app.get("/api/auth/me")
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get current user information."""
-    return {
-        "user_id": current_user.id,
-        "email": current_user.email,
-        "first_name": current_user.first_name,
-        "last_name": current_user.last_name,
-        "username": current_user.username
-    }
+    return user_profile(current_user)
 
 # Chat Endpoints
+# Substring match (no word boundaries) to keep the original keyword semantics
+MEMORY_UPDATE_RE = re.compile("update|change|modify|set|remember|store|save|add", re.IGNORECASE)
+
+async def persist_memory_turn(user_id: str, session_id: str, messages: List[Dict[str, Any]]):
+    """Store a chat turn in Zep and Mem0; failures are logged, not raised."""
+    logger.debug("Storing conversation in Zep and Mem0...")
+    stored = await fanout_memory_write(user_id, session_id, messages)
+    for store, result in stored.items():
+        if isinstance(result, Exception):
+            logger.warning("Error storing in %s: %s", store, result)
+    logger.debug("Conversation stored in memory systems")
+
+async def persist_chat_history(user_id: str, session_id: str, message: str, response_text: str):
+    """Insert the user and assistant rows for a chat turn; failures are logged, not raised."""
+    await persist_chat_turns(user_id, session_id, [(message, response_text)])
+
+async def persist_chat_turns(user_id: str, session_id: str, turns: List[Tuple[str, str]]):
+    """Insert the user and assistant rows for (message, response) turns in order; failures are logged, not raised."""
+    logger.debug("Storing conversation in database...")
+    async with AsyncSessionLocal() as db:
+        try:
+            # One multi-row INSERT for every row of every turn
+            rows = []
+            for message, response_text in turns:
+                rows.append({
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "session_id": session_id,
+                    "message": message,
+                    "response": "",
+                    "message_type": "user"
+                })
+                rows.append({
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "session_id": session_id,
+                    "message": "",
+                    "response": response_text,
+                    "message_type": "assistant"
+                })
+            await db.execute(insert(ChatHistory), rows)
+            await db.commit()
+            logger.debug("Conversation stored in database successfully")
+        except Exception as e:
+            await db.rollback()
+            logger.warning("Database error: %s", e)
+
+async def build_chat_prompt(chat_data: ChatMessage):
+    """Fetch the user's Mem0 context and build the agent prompt; returns (prompt, is_memory_update)."""
+    # Get user's existing memories from Mem0 using custom function
+    logger.debug("Retrieving user memories from Mem0...")
+    try:
+        memory_context = await asyncio.wait_for(
+            mem0_get_memory_context(chat_data.user_id), timeout=MEMORY_CALL_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        memory_context = "Memory retrieval timed out."
+        logger.warning("Mem0 memory retrieval timed out after %ss", MEMORY_CALL_TIMEOUT)
+    except Exception as e:
+        memory_context = f"Error retrieving memories: {str(e)}"
+        logger.warning("Error retrieving memories: %s", e)
+    
+    # Check if this is a memory update request
+    logger.debug("Analyzing message type...")
+    is_memory_update = MEMORY_UPDATE_RE.search(chat_data.message) is not None
+    logger.debug("Message type: %s", 'Memory update' if is_memory_update else 'Regular chat')
+    
+    template = MEMORY_UPDATE_PROMPT_TEMPLATE if is_memory_update else CHAT_PROMPT_TEMPLATE
+    prompt = template.format(
+        message=chat_data.message,
+        user_id=chat_data.user_id,
+        memory_context=memory_context
+    )
+    return prompt, is_memory_update
+
+def fallback_reply(chat_data: ChatMessage, is_memory_update: bool) -> str:
+    """Canned reply used when the agent call fails."""
+    if is_memory_update:
+        return f"I understand you want to update your information. I'll remember that for you. Your message was: {chat_data.message}"
+    return f"Hello! I received your message: '{chat_data.message}'. I'm here to help you with any questions or tasks you might have."
+
+async def generate_chat_reply(user_agent, chat_data: ChatMessage) -> str:
+    """Build the prompt and run the agent; falls back to a canned reply if the agent call fails."""
+    prompt, is_memory_update = await build_chat_prompt(chat_data)
+    
+    # Process message with user-specific agent
+    logger.debug("Processing message with Agno agent...")
+    logger.debug("Starting chat processing for user %s", chat_data.user_id)
+    
+    try:
+        response = await run_agent(
+            user_agent,
+            prompt,
+            user_id=chat_data.user_id,
+            session_id=chat_data.session_id
+        )
+        logger.debug("Chat message processed successfully")
+        return content_to_text(response)
+    except Exception as agno_error:
+        logger.warning("Agno agent error: %s", agno_error)
+        response_content = fallback_reply(chat_data, is_memory_update)
+        logger.debug("Using fallback response: %s", response_content)
+        return response_content
+
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat(chat_data: ChatMessage, current_user: User = Depends(get_current_user)):
+async def chat(chat_data: ChatMessage, background_tasks: BackgroundTasks, current_user: User = Depends(get_current_user)):
     """Process a chat message using Agno agent with Mem0 memory integration."""
-    print("=" * 80)
-    print("CHAT REQUEST RECEIVED")
-    print("=" * 80)
-    print(f"User ID: {chat_data.user_id}")
-    print(f"Session ID: {chat_data.session_id}")
-    print(f"Message: {chat_data.message}")
+    logger.debug("CHAT REQUEST RECEIVED")
+    logger.debug("User ID: %s", chat_data.user_id)
+    logger.debug("Session ID: %s", chat_data.session_id)
+    logger.debug("Message: %s", chat_data.message)
     
     try:
         # Verify user_id matches authenticated user
-        print("STEP 1: Verifying user authentication...")
+        logger.debug("Verifying user authentication...")
         if chat_data.user_id != current_user.id:
-            print(f"✗ User ID mismatch: {chat_data.user_id} != {current_user.id}")
+            logger.warning("User ID mismatch: %s != %s", chat_data.user_id, current_user.id)
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="User ID mismatch"
             )
-        print(f"✓ User authentication verified")
+        logger.debug("User authentication verified")
         
         # Get user-specific agent
-        print("STEP 2: Getting user-specific agent...")
+        logger.debug("Getting user-specific agent...")
         try:
             user_agent = get_user_agent(chat_data.user_id, chat_data.session_id)
-            print(f"✓ User agent retrieved successfully")
+            logger.debug("User agent retrieved successfully")
         except Exception as e:
-            print(f"✗ Failed to create user agent: {e}")
+            logger.warning("Failed to create user agent: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to initialize user agent: {str(e)}"
             )
         
-        # Get user's existing memories from Mem0 using custom function
-        print("STEP 3: Retrieving user memories from Mem0...")
-        try:
-            user_memories = await mem0_get_all_memories(chat_data.user_id)
-            memory_context = "\n".join([f"- {memory['memory']}" for memory in user_memories]) if user_memories else "No previous memories found."
-            print(f"✓ Retrieved {len(user_memories) if user_memories else 0} memories from Mem0")
-        except Exception as e:
-            memory_context = f"Error retrieving memories: {str(e)}"
-            print(f"✗ Error retrieving memories: {e}")
-        
-        # Check if this is a memory update request
-        print("STEP 4: Analyzing message type...")
-        is_memory_update = any(keyword in chat_data.message.lower() for keyword in [
-            "update", "change", "modify", "set", "remember", "store", "save", "add"
-        ])
-        print(f"✓ Message type: {'Memory update' if is_memory_update else 'Regular chat'}")
-        
-        # Process message with user-specific agent
-        print("STEP 5: Processing message with Agno agent...")
-        print(f"Starting chat processing for user {chat_data.user_id}")
-        
-        try:
-            if is_memory_update:
-                print("  - Processing as memory update request...")
-                update_prompt = f"""
-                User message: {chat_data.message}
-                User ID: {chat_data.user_id}
-                
-                Previous memories about this user:
-                {memory_context}
-                
-                This appears to be a memory update request. Please:
-                1. Process the user's request to update their information for user ID: {chat_data.user_id}
-                2. Store the updated information in BOTH Zep and Mem0 memory systems for user {chat_data.user_id}
-                3. Ensure consistency across all memory sources for user {chat_data.user_id}
-                4. Confirm the update was successful for user {chat_data.user_id}
-                5. Provide a clear response about what was updated for user {chat_data.user_id}
-                
-                CRITICAL: Only update memories for user {chat_data.user_id}. Do NOT modify memories for other users.
-                Important: Make sure the information is stored consistently in both memory systems for this specific user.
-                
-                MEMORY STORAGE INSTRUCTIONS:
-                - Use Zep tools to store temporal/conversation memories for user {chat_data.user_id}
-                - Use Mem0 tools to store factual/personal information for user {chat_data.user_id}
-                - Make sure both systems are updated with the same information for user {chat_data.user_id}
-                - Confirm storage in both systems before responding
-                """
-                
-                response = user_agent.run(
-                    update_prompt,
-                    user_id=chat_data.user_id,
-                    session_id=chat_data.session_id,
-                    stream=False
-                )
-                print(f"✓ Memory update processed successfully")
-            else:
-                print("  - Processing as regular chat message...")
-                chat_prompt = f"""
-                User message: {chat_data.message}
-                User ID: {chat_data.user_id}
-                
-                Previous memories about this user:
-                {memory_context}
-                
-                CRITICAL: Only access memories for user {chat_data.user_id}. Do NOT access memories from other users.
-                If you don't have specific memories for user {chat_data.user_id}, start fresh and don't reference other users' data.
-                
-                Respond to the user's message based ONLY on their own memories and context.
-                Use the memory context above to provide personalized responses.
-                """
-                
-                response = user_agent.run(
-                    chat_prompt,
-                    user_id=chat_data.user_id,
-                    session_id=chat_data.session_id,
-                    stream=False
-                )
-                print(f"✓ Chat message processed successfully")
-        except Exception as agno_error:
-            print(f"✗ Agno agent error: {agno_error}")
-            if is_memory_update:
-                response_content = f"I understand you want to update your information. I'll remember that for you. Your message was: {chat_data.message}"
-            else:
-                response_content = f"Hello! I received your message: '{chat_data.message}'. I'm here to help you with any questions or tasks you might have."
-            
-            class SimpleResponse:
-                def __init__(self, content):
-                    self.content = content
-            
-            response = SimpleResponse(response_content)
-            print(f"✓ Using fallback response: {response_content}")
+        response_text = await generate_chat_reply(user_agent, chat_data)
         
-        # Store the conversation in Mem0 memory using custom function
-        print("STEP 6: Storing conversation in Mem0...")
-        try:
-            messages = [
-                {"role": "user", "content": chat_data.message},
-                {"role": "assistant", "content": str(response.content) if response.content else ""}
-            ]
-            await mem0_add_memory(chat_data.user_id, messages)
-            print(f"✓ Conversation stored in Mem0 successfully")
-        except Exception as e:
-            print(f"✗ Error storing in Mem0: {e}")
-        
-        # Store the conversation in Zep memory
-        print("STEP 7: Storing conversation in Zep...")
-        try:
-            zep_messages = [
-                {
-                    "role": "user",
-                    "content": chat_data.message,
-                    "metadata": {"user_id": chat_data.user_id, "timestamp": datetime.utcnow().isoformat()}
-                },
-                {
-                    "role": "assistant", 
-                    "content": str(response.content) if response.content else "",
-                    "metadata": {"user_id": chat_data.user_id, "timestamp": datetime.utcnow().isoformat()}
-                }
-            ]
-            await zep_add_memory(chat_data.session_id, zep_messages)
-            print(f"✓ Conversation stored in Zep successfully")
-        except Exception as e:
-            print(f"✗ Error storing in Zep: {e}")
-        
-        # Store the chat message in the database
-        print("STEP 8: Storing conversation in database...")
-        db = SessionLocal()
-        try:
-            import uuid
-            
-            user_message = ChatHistory(
-                id=str(uuid.uuid4()),
-                user_id=chat_data.user_id,
-                session_id=chat_data.session_id,
-                message=chat_data.message,
-                response="",
-                message_type="user"
-            )
-            db.add(user_message)
-            
-            assistant_message = ChatHistory(
-                id=str(uuid.uuid4()),
-                user_id=chat_data.user_id,
-                session_id=chat_data.session_id,
-                message="",
-                response=str(response.content) if response.content else "",
-                message_type="assistant"
-            )
-            db.add(assistant_message)
-            
-            db.commit()
-            print(f"✓ Conversation stored in database successfully")
-        except Exception as e:
-            db.rollback()
-            print(f"✗ Database error: {e}")
-        finally:
-            db.close()
+        # Persist the turn after the response is sent; the client only needs the reply
+        messages = [
+            {"role": "user", "content": chat_data.message},
+            {"role": "assistant", "content": response_text}
+        ]
+        # Background tasks run one after another: queue the quick history insert
+        # first so it doesn't wait behind the Zep/Mem0 round-trips
+        background_tasks.add_task(
+            persist_chat_history, chat_data.user_id, chat_data.session_id, chat_data.message, response_text
+        )
+        background_tasks.add_task(persist_memory_turn, chat_data.user_id, chat_data.session_id, messages)
         
         # Prepare response
-        print("STEP 9: Preparing final response...")
+        logger.debug("Preparing final response...")
         final_response = ChatResponse(
-            response=str(response.content) if response.content else "",
+            response=response_text,
             session_id=chat_data.session_id,
             user_id=chat_data.user_id,
-            timestamp=datetime.utcnow()
+            timestamp=datetime.now(UTC)
         )
         
-        print("=" * 80)
-        print("CHAT RESPONSE:")
-        print(f"User ID: {final_response.user_id}")
-        print(f"Session ID: {final_response.session_id}")
-        print(f"Response: {final_response.response}")
-        print(f"Timestamp: {final_response.timestamp}")
-        print("=" * 80)
+        logger.debug("CHAT RESPONSE:")
+        logger.debug("User ID: %s", final_response.user_id)
+        logger.debug("Session ID: %s", final_response.session_id)
+        logger.debug("Response: %s", final_response.response)
+        logger.debug("Timestamp: %s", final_response.timestamp)
         
         return final_response
         
-    except HTTPException:
-        print("✗ Chat processing failed with HTTP exception")
-        raise
-    except Exception as e:
-        print(f"✗ Chat processing failed with unexpected error: {e}")
+    except (httpx.HTTPError, SQLAlchemyError) as e:
+        logger.warning("Chat processing failed: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Chat processing failed: {str(e)}"
+        )
+
+MAX_CHAT_BATCH_SIZE = 20
+
+@app.post("/api/chat/batch", response_model=List[ChatResponse])
+async def chat_batch(
+    batch: List[ChatMessage],
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Process several chat messages for the authenticated user in one request.
+    
+    Messages are answered in order, as if sent to /api/chat one after another.
+    Their memory and history writes are persisted per session after the
+    response, so Zep and Mem0 each see one write per session instead of one per
+    message.
+    """
+    logger.debug("CHAT BATCH REQUEST RECEIVED: %s messages", len(batch))
+    if not batch or len(batch) > MAX_CHAT_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Batch must contain between 1 and {MAX_CHAT_BATCH_SIZE} messages"
+        )
+    if any(chat_data.user_id != current_user.id for chat_data in batch):
+        logger.warning("User ID mismatch in chat batch for %s", current_user.id)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User ID mismatch"
+        )
+    
+    try:
+        responses: List[ChatResponse] = []
+        turns_by_session: Dict[str, List[Tuple[str, str]]] = {}
+        for chat_data in batch:
+            try:
+                user_agent = get_user_agent(chat_data.user_id, chat_data.session_id)
+            except Exception as e:
+                logger.warning("Failed to create user agent: %s", e)
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to initialize user agent: {str(e)}"
+                )
+            
+            # Sequential on purpose: the user's agent is shared and later
+            # messages may build on earlier replies
+            response_text = await generate_chat_reply(user_agent, chat_data)
+            turns_by_session.setdefault(chat_data.session_id, []).append((chat_data.message, response_text))
+            responses.append(ChatResponse(
+                response=response_text,
+                session_id=chat_data.session_id,
+                user_id=chat_data.user_id,
+                timestamp=datetime.now(UTC)
+            ))
+        
+        # Background tasks run in order: queue every history insert before the
+        # slower Zep/Mem0 writes so none of them waits behind a memory round-trip
+        for session_id, turns in turns_by_session.items():
+            background_tasks.add_task(persist_chat_turns, current_user.id, session_id, turns)
+        for session_id, turns in turns_by_session.items():
+            messages = []
+            for message, response_text in turns:
+                messages.append({"role": "user", "content": message})
+                messages.append({"role": "assistant", "content": response_text})
+            background_tasks.add_task(persist_memory_turn, current_user.id, session_id, messages)
+        
+        logger.debug("Chat batch processed: %s responses", len(responses))
+        return responses
+        
+    except (httpx.HTTPError, SQLAlchemyError) as e:
+        logger.warning("Chat batch processing failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Chat processing failed: {str(e)}"
         )
 
+def sse_event(payload: Dict[str, Any]) -> bytes:
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+async def stream_agent_events(
+    agent,
+    prompt: str,
+    user_id: str,
+    session_id: str,
+    parts: List[str],
+    done_fields: Dict[str, Any],
+    fallback: Optional[str] = None
+):
+    """
+    Yield {"delta": ...} events from a streamed agent run, then a final
+    {"done": true, "response": ...} event carrying done_fields.
+    
+    If the run fails before producing text, the fallback reply is sent instead,
+    or the done event carries the error when there is no fallback.
+    """
+    error = None
+    try:
+        stream = await agent.arun(prompt, user_id=user_id, session_id=session_id, stream=True)
+        async for chunk in stream:
+            delta = getattr(chunk, "content", None)
+            if isinstance(delta, str) and delta:
+                parts.append(delta)
+                yield sse_event({"delta": delta})
+    except Exception as agno_error:
+        logger.warning("Agno agent stream error: %s", agno_error)
+        if not parts:
+            if fallback is not None:
+                parts.append(fallback)
+                yield sse_event({"delta": fallback})
+            else:
+                error = str(agno_error)
+    
+    done = {"done": True, "response": "".join(parts), **done_fields, "timestamp": iso_now()}
+    if error is not None:
+        done["error"] = error
+    yield sse_event(done)
+
+async def sse_done_only(response_text: str, done_fields: Dict[str, Any]):
+    """Single-event stream for streaming requests answered without the agent."""
+    yield sse_event({"done": True, "response": response_text, **done_fields, "timestamp": iso_now()})
+
+async def persist_streamed_turn(user_id: str, session_id: str, message: str, parts: List[str]):
+    """Persist a streamed turn once the stream has finished and parts holds the full reply."""
+    response_text = "".join(parts)
+    messages = [
+        {"role": "user", "content": message},
+        {"role": "assistant", "content": response_text}
+    ]
+    await asyncio.gather(
+        persist_memory_turn(user_id, session_id, messages),
+        persist_chat_history(user_id, session_id, message, response_text)
+    )
+
+@app.post("/api/chat/stream")
+async def chat_stream(chat_data: ChatMessage, current_user: User = Depends(get_current_user)):
+    """
+    Stream the agent's reply as server-sent events.
+    
+    Each event carries {"delta": ...}; the last one is {"done": true, ...} with
+    the full response. The turn is persisted after the stream completes.
+    """
+    logger.debug("CHAT STREAM REQUEST RECEIVED for user %s, session %s", chat_data.user_id, chat_data.session_id)
+    if chat_data.user_id != current_user.id:
+        logger.warning("User ID mismatch: %s != %s", chat_data.user_id, current_user.id)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User ID mismatch"
+        )
+    
+    try:
+        user_agent = get_user_agent(chat_data.user_id, chat_data.session_id)
+    except Exception as e:
+        logger.warning("Failed to create user agent: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to initialize user agent: {str(e)}"
+        )
+    
+    prompt, is_memory_update = await build_chat_prompt(chat_data)
+    parts: List[str] = []
+    
+    return StreamingResponse(
+        stream_agent_events(
+            user_agent,
+            prompt,
+            user_id=chat_data.user_id,
+            session_id=chat_data.session_id,
+            parts=parts,
+            done_fields={"session_id": chat_data.session_id, "user_id": chat_data.user_id},
+            fallback=fallback_reply(chat_data, is_memory_update)
+        ),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+        background=BackgroundTask(
+            persist_streamed_turn, chat_data.user_id, chat_data.session_id, chat_data.message, parts
+        )
+    )
+
 # Memory Endpoints
 @app.get("/api/memory", response_model=MemoryResponse)
 async def get_memory(
@@ -1424,13 +2179,14 @@ async def get_memory(
         try:
             user_agent = get_user_agent(user_id, session_id or "memory_session")
         except Exception as e:
-            print(f"Failed to create user agent for memory: {e}")
+            logger.warning("Failed to create user agent for memory: %s", e)
             user_agent = None
         
-        # Get memory from Zep
-        try:
-            if session_id:
-                zep_data = await zep_get_memory(session_id)
+        async def _fetch_zep():
+            if not session_id:
+                return {"status": "no_session_id", "user_id": user_id}
+            try:
+                zep_data = await asyncio.wait_for(zep_get_memory(session_id), timeout=MEMORY_CALL_TIMEOUT)
                 if isinstance(zep_data, dict):
                     zep_data["user_id"] = user_id
                     zep_data["session_id"] = session_id
@@ -1441,39 +2197,47 @@ async def get_memory(
                     if "metadata" in zep_data:
                         zep_data["metadata"]["user_id"] = user_id
                         zep_data["metadata"]["session_id"] = session_id
-            else:
-                zep_data = {"status": "no_session_id", "user_id": user_id}
-        except Exception as e:
-            zep_data = {"error": str(e), "user_id": user_id, "session_id": session_id}
-        
-        # Get memory from Mem0 using custom function
-        try:
-            mem0_data = await mem0_get_all_memories(user_id)
-            # Add user context to each Mem0 memory
-            if isinstance(mem0_data, list):
-                for memory in mem0_data:
-                    memory["user_id"] = user_id
-                    memory["session_id"] = session_id
-                    if "metadata" in memory:
-                        memory["metadata"]["user_id"] = user_id
-                        memory["metadata"]["session_id"] = session_id
-        except Exception as e:
-            mem0_data = {"error": str(e), "user_id": user_id, "session_id": session_id}
-        
-        # Get memory from Agno agent
-        try:
-            if user_agent:
-                memory_response = user_agent.run(
+                return zep_data
+            except asyncio.TimeoutError:
+                return {"status": "timeout", "user_id": user_id, "session_id": session_id}
+            except Exception as e:
+                return {"error": str(e), "user_id": user_id, "session_id": session_id}
+        
+        async def _fetch_mem0():
+            try:
+                mem0_data = await asyncio.wait_for(mem0_get_all_memories(user_id), timeout=MEMORY_CALL_TIMEOUT)
+                if mem0_data is None:
+                    return {"error": "Failed to retrieve Mem0 memories", "user_id": user_id, "session_id": session_id}
+                # Add user context to each Mem0 memory
+                if isinstance(mem0_data, list):
+                    for memory in mem0_data:
+                        memory["user_id"] = user_id
+                        memory["session_id"] = session_id
+                        if "metadata" in memory:
+                            memory["metadata"]["user_id"] = user_id
+                            memory["metadata"]["session_id"] = session_id
+                return mem0_data
+            except asyncio.TimeoutError:
+                return {"status": "timeout", "user_id": user_id, "session_id": session_id}
+            except Exception as e:
+                return {"error": str(e), "user_id": user_id, "session_id": session_id}
+        
+        async def _analyze():
+            if not user_agent:
+                return "Agent not available for memory analysis"
+            try:
+                memory_response = await run_agent(
+                    user_agent,
                     "Analyze and summarize your memories for this user. Return a JSON with counts for zep_memories and mem0_memories.",
                     user_id=user_id,
-                    session_id=session_id or "memory_session",
-                    stream=False
+                    session_id=session_id or "memory_session"
                 )
-                consolidated = str(memory_response.content) if memory_response.content else "Memory analysis completed"
-            else:
-                consolidated = "Agent not available for memory analysis"
-        except Exception as e:
-            consolidated = f"Error analyzing memory: {str(e)}"
+                return content_to_text(memory_response) or "Memory analysis completed"
+            except Exception as e:
+                return f"Error analyzing memory: {str(e)}"
+        
+        # Zep, Mem0 and the agent summary are independent; run them concurrently
+        zep_data, mem0_data, consolidated = await asyncio.gather(_fetch_zep(), _fetch_mem0(), _analyze())
         
         return MemoryResponse(
             user_id=user_id,
@@ -1483,134 +2247,237 @@ async def get_memory(
             consolidated_memory=consolidated
         )
         
-    except HTTPException:
-        raise
-    except Exception as e:
+    except (httpx.HTTPError, SQLAlchemyError) as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve memory: {str(e)}"
         )
 
+# A Mem0 hit scoring at least this high answers a search on its own, without
+# asking the agent to summarize it (set above 1 to always use the agent)
+SEARCH_DIRECT_ANSWER_SCORE = float(os.getenv("SEARCH_DIRECT_ANSWER_SCORE", "0.85"))
+
+def best_direct_answer(mem0_results) -> Optional[str]:
+    """Return the top Mem0 memory if its relevance score clears SEARCH_DIRECT_ANSWER_SCORE."""
+    if not isinstance(mem0_results, list) or not mem0_results:
+        return None
+    best = max(mem0_results, key=lambda result: result.get("score") or 0)
+    if (best.get("score") or 0) >= SEARCH_DIRECT_ANSWER_SCORE and best.get("memory"):
+        return best["memory"]
+    return None
+
+async def prepare_memory_search(user_id: str, query: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Search Zep and Mem0 for a query; returns (result, search_prompt).
+    
+    result is set when the stores alone answer the query (nothing matched, or a
+    high-confidence Mem0 hit); otherwise search_prompt is the agent prompt built
+    from both stores' results.
+    """
+    # Search Zep and Mem0 directly, concurrently
+    logger.debug("Searching Zep and Mem0 memory...")
+    zep_results, mem0_results = await fanout_memory_search(user_id, query)
+    try:
+        if isinstance(mem0_results, Exception):
+            raise mem0_results
+        mem0_context = "\n".join(f"- {result['memory']}" for result in mem0_results) if mem0_results else "No relevant memories found in Mem0."
+        logger.debug("Mem0 search completed with %s results", len(mem0_results) if mem0_results else 0)
+    except Exception as e:
+        mem0_context = f"Error searching Mem0: {str(e)}"
+        logger.warning("Error searching Mem0: %s", e)
+    
+    try:
+        if isinstance(zep_results, Exception):
+            raise zep_results
+        zep_context = ""
+        if isinstance(zep_results, dict) and "results" in zep_results:
+            zep_context = "\n".join(f"- {result.get('content', '')}" for result in zep_results["results"]) if zep_results["results"] else "No relevant memories found in Zep."
+        else:
+            zep_context = "No relevant memories found in Zep."
+        logger.debug("Zep search completed")
+    except Exception as e:
+        zep_context = f"Error searching Zep: {str(e)}"
+        logger.warning("Error searching Zep: %s", e)
+    
+    # Both stores answered and found nothing: the agent has nothing to summarize
+    mem0_empty = isinstance(mem0_results, list) and not mem0_results
+    if isinstance(zep_results, dict):
+        # zep_search_memory's error shape, which must not count as "no matches"
+        zep_empty = "error" not in zep_results and not zep_results.get("results")
+    else:
+        # The SDK's search result object on success
+        zep_empty = not isinstance(zep_results, Exception) and not getattr(zep_results, "results", None)
+    if mem0_empty and zep_empty:
+        logger.debug("No memories matched, skipping agent search")
+        return f"No relevant information found for user {user_id}.", None
+    
+    direct_answer = best_direct_answer(mem0_results)
+    if direct_answer is not None:
+        logger.debug("Mem0 hit above %s, skipping agent search", SEARCH_DIRECT_ANSWER_SCORE)
+        return direct_answer, None
+    
+    # Search memory using agent tools with enhanced prompt
+    search_prompt = SEARCH_PROMPT_TEMPLATE.format(
+        user_id=user_id,
+        query=query,
+        mem0_context=mem0_context,
+        zep_context=zep_context
+    )
+    return None, search_prompt
+
 @app.post("/api/memory/search", response_model=SearchResponse)
 async def search_memory(
     search_data: SearchRequest,
+    stream: bool = Query(False),
     current_user: User = Depends(get_current_user)
 ):
-    """Search memory using Agno agent."""
-    print("=" * 80)
-    print("MEMORY SEARCH REQUEST RECEIVED")
-    print("=" * 80)
-    print(f"User ID: {search_data.user_id}")
-    print(f"Search query: {search_data.query}")
+    """
+    Search memory using Agno agent.
+    
+    With ?stream=true the agent's answer is sent as server-sent events in the
+    same format as /api/chat/stream instead of a SearchResponse body.
+    """
+    logger.debug("MEMORY SEARCH REQUEST RECEIVED")
+    logger.debug("User ID: %s", search_data.user_id)
+    logger.debug("Search query: %s", search_data.query)
     
     try:
         if search_data.user_id != current_user.id:
-            print(f"✗ User ID mismatch: {search_data.user_id} != {current_user.id}")
+            logger.warning("User ID mismatch: %s != %s", search_data.user_id, current_user.id)
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="User ID mismatch"
             )
-        print(f"✓ User authentication verified")
+        logger.debug("User authentication verified")
         
         # Get user-specific agent
-        print("STEP 1: Getting user-specific agent for search...")
+        logger.debug("Getting user-specific agent for search...")
         try:
             user_agent = get_user_agent(search_data.user_id, "search_session")
-            print(f"✓ User agent retrieved successfully")
+            logger.debug("User agent retrieved successfully")
         except Exception as e:
-            print(f"✗ Failed to create user agent for search: {e}")
+            logger.warning("Failed to create user agent for search: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to initialize user agent: {str(e)}"
             )
         
-        # Search memory using Mem0 directly using custom function
-        print("STEP 2: Searching Mem0 memory...")
-        try:
-            mem0_results = await mem0_search_memory(search_data.user_id, search_data.query)
-            mem0_context = "\n".join([f"- {result['memory']}" for result in mem0_results]) if mem0_results else "No relevant memories found in Mem0."
-            print(f"✓ Mem0 search completed with {len(mem0_results) if mem0_results else 0} results")
-        except Exception as e:
-            mem0_context = f"Error searching Mem0: {str(e)}"
-            print(f"✗ Error searching Mem0: {e}")
+        search_fields = {"user_id": search_data.user_id, "query": search_data.query}
+        result, search_prompt = await prepare_memory_search(search_data.user_id, search_data.query)
+        if result is not None:
+            if stream:
+                return StreamingResponse(
+                    sse_done_only(result, search_fields), media_type="text/event-stream", headers=SSE_HEADERS
+                )
+            return SearchResponse(results=result, **search_fields)
+        
+        logger.debug("Performing comprehensive memory search with agent...")
+        if stream:
+            logger.debug("Streaming agent search...")
+            return StreamingResponse(
+                stream_agent_events(
+                    user_agent,
+                    search_prompt,
+                    user_id=search_data.user_id,
+                    session_id="search_session",
+                    parts=[],
+                    done_fields=search_fields
+                ),
+                media_type="text/event-stream",
+                headers=SSE_HEADERS
+            )
         
-        # Search memory using Zep directly
-        print("STEP 3: Searching Zep memory...")
-        try:
-            zep_results = await zep_search_memory(search_data.user_id, search_data.query)
-            zep_context = ""
-            if isinstance(zep_results, dict) and "results" in zep_results:
-                zep_context = "\n".join([f"- {result.get('content', '')}" for result in zep_results["results"]]) if zep_results["results"] else "No relevant memories found in Zep."
-            else:
-                zep_context = "No relevant memories found in Zep."
-            print(f"✓ Zep search completed")
-        except Exception as e:
-            zep_context = f"Error searching Zep: {str(e)}"
-            print(f"✗ Error searching Zep: {e}")
-        
-        # Search memory using agent tools with enhanced prompt
-        print("STEP 4: Performing comprehensive memory search with agent...")
-        search_prompt = f"""
-        SEARCH REQUEST: {search_data.query}
-        USER ID: {search_data.user_id}
-        
-        Mem0 search results for user {search_data.user_id}:
-        {mem0_context}
-        
-        Zep search results for user {search_data.user_id}:
-        {zep_context}
-        
-        Please search through ALL memory sources (Zep and Mem0) for user {search_data.user_id} to find information related to: {search_data.query}
-        
-        CRITICAL USER ISOLATION RULES:
-        1. ONLY search within user {search_data.user_id} memory space
-        2. DO NOT access memories from other users
-        3. DO NOT search across user boundaries
-        4. Search Zep memory for temporal/conversation memories related to: {search_data.query}
-        5. Search Mem0 memory for factual/personal information related to: {search_data.query}
-        6. Look for exact matches, partial matches, and related information
-        7. If you find information, provide a comprehensive summary
-        8. If no information is found, clearly state that no relevant information was found for user {search_data.user_id}
-        9. ALWAYS include user_id={search_data.user_id} in your tool calls
-        10. NEVER search outside of user {search_data.user_id} memory namespace
-        
-        Search terms to look for: {search_data.query}
-        Target user: {search_data.user_id}
-        
-        Please provide a detailed response with all relevant information found for user {search_data.user_id} only.
-        """
-        
-        print(f"  - Executing agent search with prompt...")
-        response = user_agent.run(
+        logger.debug("Executing agent search with prompt...")
+        response = await cached_agent_run(
+            user_agent,
+            (search_data.user_id, "search", normalize_query(search_data.query)),
             search_prompt,
             user_id=search_data.user_id,
-            session_id="search_session",
-            stream=False
+            session_id="search_session"
         )
-        print(f"✓ Agent search completed successfully")
+        logger.debug("Agent search completed successfully")
         
         # Prepare final response
-        print("STEP 5: Preparing search response...")
+        logger.debug("Preparing search response...")
         final_response = SearchResponse(
             user_id=search_data.user_id,
             query=search_data.query,
-            results=str(response.content) if response.content else ""
+            results=content_to_text(response)
         )
         
-        print("=" * 80)
-        print("MEMORY SEARCH RESPONSE:")
-        print(f"User ID: {final_response.user_id}")
-        print(f"Query: {final_response.query}")
-        print(f"Results: {final_response.results}")
-        print("=" * 80)
+        logger.debug("MEMORY SEARCH RESPONSE:")
+        logger.debug("User ID: %s", final_response.user_id)
+        logger.debug("Query: %s", final_response.query)
+        logger.debug("Results: %s", final_response.results)
         
         return final_response
         
-    except HTTPException:
-        print("✗ Memory search failed with HTTP exception")
-        raise
+    except (httpx.HTTPError, SQLAlchemyError) as e:
+        logger.warning("Memory search failed: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Memory search failed: {str(e)}"
+        )
+
+MAX_SEARCH_BATCH_SIZE = 20
+
+@app.post("/api/memory/search/batch", response_model=List[SearchResponse])
+async def search_memory_batch(
+    batch: List[SearchRequest],
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Run several memory searches for the authenticated user in one request.
+    
+    Results are returned in request order. The Zep/Mem0 lookups for all queries
+    run concurrently; agent summaries, where needed, run one after another on
+    the user's agent.
+    """
+    logger.debug("MEMORY SEARCH BATCH REQUEST RECEIVED: %s queries", len(batch))
+    if not batch or len(batch) > MAX_SEARCH_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Batch must contain between 1 and {MAX_SEARCH_BATCH_SIZE} queries"
+        )
+    if any(search_data.user_id != current_user.id for search_data in batch):
+        logger.warning("User ID mismatch in search batch for %s", current_user.id)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User ID mismatch"
+        )
+    
+    try:
+        user_agent = get_user_agent(current_user.id, "search_session")
     except Exception as e:
-        print(f"✗ Memory search failed with unexpected error: {e}")
+        logger.warning("Failed to create user agent for search: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to initialize user agent: {str(e)}"
+        )
+    
+    try:
+        prepared = await asyncio.gather(
+            *(prepare_memory_search(search_data.user_id, search_data.query) for search_data in batch)
+        )
+        
+        responses: List[SearchResponse] = []
+        for search_data, (result, search_prompt) in zip(batch, prepared):
+            if result is None:
+                response = await cached_agent_run(
+                    user_agent,
+                    (search_data.user_id, "search", normalize_query(search_data.query)),
+                    search_prompt,
+                    user_id=search_data.user_id,
+                    session_id="search_session"
+                )
+                result = content_to_text(response)
+            responses.append(SearchResponse(user_id=search_data.user_id, query=search_data.query, results=result))
+        
+        logger.debug("Memory search batch completed: %s results", len(responses))
+        return responses
+        
+    except (httpx.HTTPError, SQLAlchemyError) as e:
+        logger.warning("Memory search batch failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Memory search failed: {str(e)}"
@@ -1619,110 +2486,155 @@ async def search_memory(
 @app.post("/api/memory/consolidate")
 async def consolidate_memory(
     user_id: str,
-    current_user: User = Depends(get_current_user)
+    stream: bool = Query(False),
+    current_user: User = Depends(require_matching_user)
 ):
-    """Synchronize and resolve memory conflicts for a user."""
+    """
+    Synchronize and resolve memory conflicts for a user.
+    
+    With ?stream=true the sync summary is sent as server-sent events; the final
+    event's "response" holds what would otherwise be "sync_result".
+    """
     try:
-        if user_id != current_user.id:
+        # Fetch both memory stores concurrently and diff them locally
+        zep_facts, mem0_memories = await asyncio.gather(
+            zep_get_user_facts(user_id),
+            mem0_get_all_memories(user_id)
+        )
+        failed = [name for name, data in (("Zep", zep_facts), ("Mem0", mem0_memories)) if data is None]
+        if failed:
+            # An unreadable store is an outage, not an empty (and so consistent) one
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="User ID mismatch"
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Memory synchronization failed: could not read memories from {' and '.join(failed)}"
             )
+        differences = diff_memory_facts(zep_facts, mem0_memories)
+        
+        # Only involve the agent when the stores actually disagree
+        if not differences["zep_only"] and not differences["mem0_only"]:
+            consistent = "Zep and Mem0 memories are already consistent; nothing to synchronize."
+            if stream:
+                return StreamingResponse(
+                    sse_done_only(consistent, {"user_id": user_id, "status": "completed"}),
+                    media_type="text/event-stream",
+                    headers=SSE_HEADERS
+                )
+            return {
+                "user_id": user_id,
+                "sync_result": consistent,
+                "sync_timestamp": iso_now(),
+                "status": "completed"
+            }
         
-        # Force memory synchronization
-        sync_prompt = f"""
-        Perform a comprehensive memory synchronization for user {user_id}.
-        
-        Tasks:
-        1. Search through ALL memory sources (Zep and Mem0) for user {user_id}
-        2. Identify any conflicting information
-        3. Resolve conflicts by keeping the most recent/accurate data
-        4. Update both memory systems to be consistent
-        5. Provide a summary of what was synchronized
-        
-        Focus on:
-        - Personal information (name, preferences, etc.)
-        - Recent conversation context
-        - Any contradictory data points
+        sync_prompt = SYNC_PROMPT_TEMPLATE.format(
+            user_id=user_id,
+            zep_only=_format_fact_list(differences["zep_only"]),
+            mem0_only=_format_fact_list(differences["mem0_only"])
+        )
         
-        CRITICAL: Only work with memories for user {user_id}. Do NOT access memories from other users.
-        """
+        user_agent = get_user_agent(user_id, "memory_sync_session")
+        if stream:
+            return StreamingResponse(
+                stream_agent_events(
+                    user_agent,
+                    sync_prompt,
+                    user_id=user_id,
+                    session_id="memory_sync_session",
+                    parts=[],
+                    done_fields={"user_id": user_id, "status": "completed"}
+                ),
+                media_type="text/event-stream",
+                headers=SSE_HEADERS,
+                background=BackgroundTask(invalidate_user_memory_caches, user_id)
+            )
         
-        response = get_user_agent(user_id, "memory_sync_session").run(
+        response = await cached_agent_run(
+            user_agent,
+            (user_id, "sync", sync_prompt),
             sync_prompt,
             user_id=user_id,
-            session_id="memory_sync_session",
-            stream=False
+            session_id="memory_sync_session"
         )
+        # The sync may have rewritten memories through the agent's tools
+        invalidate_user_memory_caches(user_id)
         
         return {
             "user_id": user_id,
-            "sync_result": str(response.content) if response.content else "",
-            "sync_timestamp": datetime.utcnow().isoformat(),
+            "sync_result": content_to_text(response),
+            "sync_timestamp": iso_now(),
             "status": "completed"
         }
         
-    except HTTPException:
-        raise
-    except Exception as e:
+    except (httpx.HTTPError, SQLAlchemyError) as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Memory synchronization failed: {str(e)}"
         )
 
 # History Endpoints
+DEFAULT_HISTORY_LIMIT = 50
+MAX_HISTORY_LIMIT = 200
+
 @app.get("/api/history", response_model=HistoryResponse)
 async def get_chat_history(
     user_id: str,
+    request: Request,
+    response: Response,
     session_id: Optional[str] = None,
-    limit: Optional[int] = 50,
-    current_user: User = Depends(get_current_user)
+    limit: int = Query(DEFAULT_HISTORY_LIMIT, ge=1, le=MAX_HISTORY_LIMIT),
+    current_user: User = Depends(require_matching_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get chat history for a user."""
+    """
+    Get chat history for a user.
+    
+    Responses carry a weak ETag derived from the newest timestamp and row count,
+    so clients polling with If-None-Match get a 304 without the rows being read.
+    """
     try:
-        if user_id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="User ID mismatch"
-            )
+        # Cheap metadata query to detect whether the history changed
+        filters = [ChatHistory.user_id == user_id]
+        if session_id:
+            filters.append(ChatHistory.session_id == session_id)
         
-        # Get chat history from database
-        db = SessionLocal()
-        try:
-            query = db.query(ChatHistory).filter(ChatHistory.user_id == user_id)
-            
-            if session_id:
-                query = query.filter(ChatHistory.session_id == session_id)
-            
-            query = query.order_by(ChatHistory.timestamp.desc()).limit(limit or 50)
-            history_items = query.all()
-            
-            # Convert to response format
-            messages = []
-            for item in reversed(history_items):  # Reverse to get chronological order
-                messages.append({
-                    "id": item.id,
-                    "user_id": item.user_id,
-                    "session_id": item.session_id,
-                    "message": item.message,
-                    "response": item.response,
-                    "timestamp": item.timestamp.isoformat(),
-                    "message_type": item.message_type
-                })
-            
-            return HistoryResponse(
-                user_id=user_id,
-                session_id=session_id,
-                messages=messages,
-                total_count=len(messages)
-            )
-            
-        finally:
-            db.close()
+        stats = await db.execute(
+            select(func.max(ChatHistory.timestamp), func.count()).where(*filters)
+        )
+        latest_ts, row_count = stats.one()
+        etag = f'W/"{latest_ts.timestamp() if latest_ts else 0:.0f}-{row_count}-{limit}"'
+        cache_headers = {"ETag": etag, "Cache-Control": "private, max-age=5"}
+        
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+        response.headers.update(cache_headers)
+        
+        # Get chat history from database: newest N rows, returned in chronological order
+        latest = select(
+            ChatHistory.id,
+            ChatHistory.user_id,
+            ChatHistory.session_id,
+            ChatHistory.message,
+            ChatHistory.response,
+            ChatHistory.timestamp,
+            ChatHistory.message_type
+        ).where(*filters)
+        
+        latest = latest.order_by(ChatHistory.timestamp.desc()).limit(limit).subquery()
+        stmt = select(latest).order_by(latest.c.timestamp.asc())
+        # Server-side cursor: rows are fetched in batches instead of all at once
+        result = await db.stream(stmt.execution_options(yield_per=100))
+        
+        # Rows already carry exactly the response fields; map them straight to dicts
+        messages = [dict(row) async for row in result.mappings()]
+        
+        return HistoryResponse(
+            user_id=user_id,
+            session_id=session_id,
+            messages=messages,
+            total_count=len(messages)
+        )
         
-    except HTTPException:
-        raise
-    except Exception as e:
+    except (httpx.HTTPError, SQLAlchemyError) as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get chat history: {str(e)}"
@@ -1733,33 +2645,21 @@ async def get_chat_history(
 async def start_session(
     user_id: str,
     session_id: Optional[str] = None,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_matching_user)
 ):
     """Start a new session."""
     try:
-        if user_id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="User ID mismatch"
-            )
-        
         # Generate session ID if not provided
         if not session_id:
-            session_id = str(uuid.uuid4())
+            session_id = str(uuid7())
         
         # Create session in Zep
         try:
-            async with httpx.AsyncClient() as client:
-                url = f"{ZEP_BASE_URL}/v1/sessions"
-                headers = {"Authorization": f"Api-Key {ZEP_API_KEY}"}
-                
-                payload = {
-                    "session_id": session_id,
-                    "user_id": user_id
-                }
-                
-                response = await client.post(url, json=payload, headers=headers)
-                zep_result = response.json()
+            response = await zep_http.post(
+                "/v1/sessions",
+                json={"session_id": session_id, "user_id": user_id}
+            )
+            zep_result = response.json()
         except Exception as e:
             zep_result = {"error": str(e)}
         
@@ -1770,23 +2670,28 @@ async def start_session(
             "status": "started"
         }
         
-    except HTTPException:
-        raise
-    except Exception as e:
+    except (httpx.HTTPError, SQLAlchemyError) as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to start session: {str(e)}"
         )
 
 if __name__ == "__main__":
-    print("=" * 80)
-    print("STARTING AGNOCHAT BOT SERVER")
-    print("=" * 80)
-    print("STEP 12: Starting uvicorn server...")
     import uvicorn
-    print("✓ Uvicorn imported successfully")
-    print("✓ Starting server on host: 0.0.0.0, port: 8000")
-    print("✓ Server will be available at: http://localhost:8000")
-    print("✓ API documentation will be available at: http://localhost:8000/docs")
-    print("=" * 80)
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    host = os.getenv("HOST", "0.0.0.0")
+    port = int(os.getenv("PORT", "8000"))
+    # Each worker opens its own DB pools and re-imports main; scale out deliberately
+    workers = int(os.getenv("WORKERS", "1"))
+    logger.info("Starting AgnoChat Bot server on %s:%s with %s workers", host, port, workers)
+    logger.info("API documentation will be available at: http://localhost:%s/docs", port)
+    # loop/http stay "auto": uvloop and httptools (uvicorn[standard]) are used
+    # where installed, with asyncio/h11 as the fallback (uvloop has no Windows build).
+    # Multiple workers need the import string; a single one reuses this module
+    # instead of importing it a second time.
+    uvicorn.run(
+        app if workers == 1 else "main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        log_level="info"
+    )